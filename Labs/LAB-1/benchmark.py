@@ -0,0 +1,304 @@
+"""
+Benchmark Engine for University Database Queries
+------------------------------------------------
+Times every query with warm-up and measured iterations and separates what
+the server spends executing it from what the client spends receiving it.
+
+After the warm-up, two separate passes of `runs` iterations each:
+1. Server pass: `EXPLAIN (ANALYZE, BUFFERS, TIMING OFF)` gives the server
+   planning and execution time, plus shared buffer hits / reads (cache state).
+2. Client pass: the query itself is executed and fetched, timed with
+   perf_counter on the client (server time + result transfer +
+   deserialization). With fetch="stream" it is read through a server-side
+   cursor `itersize` rows at a time, so client memory stays flat at any
+   result size, and the time to the first row and a checksum of the rows are
+   reported as well.
+EXPLAIN ANALYZE executes the query without sending its rows, so the two
+cannot come from one execution. The transfer time is therefore an estimate:
+each client time minus the median server planning + execution time.
+
+Results are summarized as min / p50 / p95 / p99 / mean / stddev and written
+as one JSON file per (label, scale) under RESULTS_DIR, together with each
+query's plan, its normalized shape and the shape's fingerprint (see
+plan_tracker.py).
+"""
+
+import hashlib
+import json
+import math
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(values, p):
+    """Linear-interpolated percentile (0–100) of a list of numbers."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * p / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values):
+    """Returns min / p50 / p95 / p99 / mean / stddev of a list of timings (ms)."""
+    return {
+        "min": round(min(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "mean": round(statistics.mean(values), 3),
+        "stddev": round(statistics.stdev(values), 3) if len(values) > 1 else 0.0,
+    }
+
+
+def rss_bytes():
+    """Current resident set size of this process (0 where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError, ValueError):
+        return 0
+
+
+@contextmanager
+def measure(record, interval=0.05):
+    """Fills `record` with wall_s, cpu_s, start_rss_mb and peak_rss_mb of the enclosed block."""
+    start_rss = rss_bytes()
+    peak = [start_rss]
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            peak[0] = max(peak[0], rss_bytes())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        stop.set()
+        sampler.join()
+        record["wall_s"] = round(time.perf_counter() - wall, 3)
+        record["cpu_s"] = round(time.process_time() - cpu, 3)
+        record["start_rss_mb"] = round(start_rss / 1024 ** 2, 1)
+        record["peak_rss_mb"] = round(max(peak[0], rss_bytes()) / 1024 ** 2, 1)
+
+
+def explain_analyze(cursor, query):
+    """
+    Runs EXPLAIN (ANALYZE, BUFFERS, TIMING OFF, FORMAT JSON) for a query.
+
+    Per-node timing is off so the instrumentation overhead stays out of the
+    execution time; row counts and buffer counts are still collected.
+
+    Returns:
+        dict with planning_ms, execution_ms, shared_hit, shared_read and the raw plan
+    """
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, TIMING OFF, FORMAT JSON) " + query)
+    explain = cursor.fetchone()[0][0]
+    plan = explain["Plan"]
+    return {
+        "planning_ms": explain.get("Planning Time", 0.0),
+        "execution_ms": explain["Execution Time"],
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "plan": explain,
+    }
+
+
+_SHAPE_KEYS = ("Node Type", "Join Type", "Strategy", "Partial Mode", "Parallel Aware", "Relation Name",
+               "Index Name", "Parent Relationship")
+
+
+def plan_shape(plan):
+    """A plan tree reduced to its operators, join types, relations and indexes (no costs, rows or timings)."""
+    shape = {key: plan[key] for key in _SHAPE_KEYS if key in plan}
+    children = [plan_shape(child) for child in plan.get("Plans", [])]
+    if children:
+        shape["Plans"] = children
+    return shape
+
+
+def plan_fingerprint(plan):
+    """Short stable hash of plan_shape(plan): equal fingerprints mean the same plan shape."""
+    return hashlib.sha1(json.dumps(plan_shape(plan), sort_keys=True).encode()).hexdigest()[:12]
+
+
+def time_client(cursor, query):
+    """Executes and fetches a query, returning (elapsed_ms, row_count)."""
+    start = time.perf_counter()
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    return (time.perf_counter() - start) * 1000, len(rows)
+
+
+def row_checksum(row):
+    """64-bit hash of one row; summed over a result it gives an order-independent checksum."""
+    return int.from_bytes(hashlib.blake2b(repr(row).encode(), digest_size=8).digest(), "little")
+
+
+def stream_client(cursor, query, itersize=2000):
+    """
+    Executes a query through a named (server-side) cursor and consumes it
+    `itersize` rows per round trip, so the client never holds more than one
+    batch whatever the result size. Rows are counted and checksummed as they
+    arrive.
+
+    Returns:
+        (first_row_ms, last_row_ms, row_count, checksum)
+    """
+    conn = cursor.connection
+    count, checksum, first_row_ms = 0, 0, None
+    start = time.perf_counter()
+    # Named cursors live in a transaction; WITH HOLD lets them work on autocommit connections too
+    with conn.cursor(name="benchmark_stream", withhold=conn.autocommit) as stream:
+        stream.itersize = itersize
+        stream.execute(query)
+        for row in stream:
+            if first_row_ms is None:
+                first_row_ms = (time.perf_counter() - start) * 1000
+            count += 1
+            checksum = (checksum + row_checksum(row)) % 2 ** 64
+    last_row_ms = (time.perf_counter() - start) * 1000
+    return first_row_ms if first_row_ms is not None else last_row_ms, last_row_ms, count, f"{checksum:016x}"
+
+
+def benchmark_query(cursor, query, warmup=2, runs=10, fetch="all", itersize=2000, cache=None):
+    """
+    Benchmarks a single query.
+
+    Args:
+        cursor: psycopg2 cursor object
+        query: SQL text
+        warmup: iterations run first and not included in the statistics
+        runs: measured iterations
+        fetch: "all" (execute + fetchall) or "stream" (server-side cursor,
+            see stream_client)
+        itersize: rows per round trip in "stream" mode
+        cache: a result_cache.ResultCache to fetch through ("all" mode)
+
+    Returns:
+        dict with client / server / transfer (estimated, see the module
+        docstring) summaries, buffer counts per
+        iteration (warm-up included, so the first, possibly cold, run is
+        visible), the row count and the client's memory growth while
+        fetching; "stream" mode adds first_row_ms and the result checksum,
+        and a cache adds this query's hits, misses and hit ratio
+    """
+    def fetch_once():
+        if fetch == "stream":
+            return stream_client(cursor, query, itersize)
+        if cache is not None:
+            start = time.perf_counter()
+            rows = cache.fetch(cursor, query)
+            return None, (time.perf_counter() - start) * 1000, len(rows), None
+        elapsed, row_count = time_client(cursor, query)
+        return None, elapsed, row_count, None
+
+    if runs < 1:
+        raise ValueError("runs must be at least 1")
+    cache_before = dict(cache.stats) if cache is not None else None
+    buffers = []
+    for _ in range(warmup):
+        server = explain_analyze(cursor, query)
+        buffers.append({"phase": "warmup", "hit": server["shared_hit"], "read": server["shared_read"]})
+        fetch_once()
+
+    server_ms, planning_ms = [], []
+    for _ in range(runs):
+        server = explain_analyze(cursor, query)
+        buffers.append({"phase": "measured", "hit": server["shared_hit"], "read": server["shared_read"]})
+        server_ms.append(server["execution_ms"])
+        planning_ms.append(server["planning_ms"])
+
+    client_ms, first_row_ms = [], []
+    memory = {}
+    with measure(memory):
+        for _ in range(runs):
+            first, elapsed, row_count, checksum = fetch_once()
+            client_ms.append(elapsed)
+            first_row_ms.append(first)
+    on_server = statistics.median(server_ms) + statistics.median(planning_ms)
+    transfer_ms = [max(elapsed - on_server, 0.0) for elapsed in client_ms]
+
+    result = {
+        "rows": row_count,
+        "fetch": fetch,
+        "client_ms": summarize(client_ms),
+        "server_ms": summarize(server_ms),
+        "planning_ms": summarize(planning_ms),
+        "transfer_ms": summarize(transfer_ms),
+        "client_peak_mb": round(memory["peak_rss_mb"] - memory["start_rss_mb"], 1),
+        "buffers": buffers,
+        "plan": server["plan"],
+        "plan_shape": plan_shape(server["plan"]["Plan"]),
+        "plan_fingerprint": plan_fingerprint(server["plan"]["Plan"]),
+    }
+    if fetch == "stream":
+        result.update(itersize=itersize, first_row_ms=summarize(first_row_ms), checksum=checksum)
+    if cache is not None:
+        hits = cache.stats["hits"] - cache_before["hits"]
+        misses = cache.stats["misses"] - cache_before["misses"]
+        result["cache"] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / max(hits + misses, 1), 3)}
+    return result
+
+
+def benchmark_suite(cursor, queries, warmup=2, runs=10, fetch="all", itersize=2000, cache=None):
+    """Benchmarks every query in a {name: sql} dict and prints a one-line summary each."""
+    results = {}
+    for qname, qtext in queries.items():
+        result = benchmark_query(cursor, qtext, warmup, runs, fetch, itersize, cache)
+        results[qname] = result
+        client, server = result["client_ms"], result["server_ms"]
+        first = result["buffers"][0]
+        print(
+            f"{qname}: p50 {client['p50']:.2f} ms (server {server['p50']:.2f} ms, "
+            f"transfer {result['transfer_ms']['p50']:.2f} ms), p95 {client['p95']:.2f} ms, "
+            f"stddev {client['stddev']:.2f} ms | first run buffers hit={first['hit']} read={first['read']}"
+            + (f" | first row {result['first_row_ms']['p50']:.2f} ms" if fetch == "stream" else "")
+            + (f" | cache hit ratio {result['cache']['hit_ratio']:.2f}" if cache is not None else "")
+            + f" | client +{result['client_peak_mb']:.1f} MB"
+        )
+    return results
+
+
+def results_path(scale, label, output_dir=RESULTS_DIR):
+    return Path(output_dir) / f"benchmark_{label}_{scale}.json"
+
+
+def save_results(results, scale, label="no_index", warmup=None, runs=None, output_dir=RESULTS_DIR):
+    """Writes one benchmark run as structured JSON and returns the file path."""
+    path = results_path(scale, label, output_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "scale": scale,
+        "label": label,
+        "warmup": warmup,
+        "runs": runs,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "queries": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, default=str)
+    print(f"📄 Results saved to '{path}'")
+    return path
+
+
+def load_results(label=None, output_dir=RESULTS_DIR):
+    """Loads every saved run (optionally for one label), sorted by scale."""
+    documents = []
+    for path in Path(output_dir).glob("benchmark_*.json"):
+        with open(path) as f:
+            document = json.load(f)
+        if label is None or document["label"] == label:
+            documents.append(document)
+    return sorted(documents, key=lambda d: (d["label"], d["scale"]))
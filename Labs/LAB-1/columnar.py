@@ -0,0 +1,282 @@
+"""
+Columnar Parquet Snapshot and In-process Engine for University Queries
+----------------------------------------------------------------------
+Offline analysis should not need a running PostgreSQL. This module:
+
+1. Exports every table of university_db to Parquet under PARQUET_DIR. Each
+   table is read with `COPY (...) TO STDOUT (FORMAT csv)` into a sink that
+   parses and writes one chunk of at most `chunk_bytes` of CSV at a time, so
+   memory stays bounded at any scale. Students are partitioned by
+   enrollment_year and Enrollments by semester (hive layout, e.g.
+   enrollments/semester=Spring%202025/part-0-0.parquet).
+2. Answers the five QUERIES in process with pyarrow.dataset + pandas:
+   filters are pushed down into the scan (partition pruning, then row-group
+   statistics), only the columns a query needs are read, and joins, DISTINCT,
+   GROUP BY and top-k run as vectorized pandas operations.
+3. Benchmarks both engines per scale: latency summary, client memory growth
+   and whether the row counts agree, saved as results/columnar_<scale>.json.
+
+Usage:
+    python columnar.py    # export + compare at every scale
+"""
+
+import json
+import shutil
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+from benchmark import RESULTS_DIR, benchmark_suite, measure, summarize
+from data_insertion import connect_db
+from queries import QUERIES
+
+PARQUET_DIR = Path(__file__).parent / "parquet"
+
+# Columns exported per table; the partition column is derived in the COPY query
+SCHEMAS = {
+    "Departments": pa.schema([
+        ("department_id", pa.int32()), ("department_name", pa.string()), ("building", pa.string()),
+    ]),
+    "Teachers": pa.schema([
+        ("teacher_id", pa.int32()), ("first_name", pa.string()), ("last_name", pa.string()),
+        ("email", pa.string()), ("department_id", pa.int32()), ("hire_date", pa.date32()),
+    ]),
+    "Courses": pa.schema([
+        ("course_id", pa.int32()), ("course_name", pa.string()), ("credits", pa.int32()),
+        ("teacher_id", pa.int32()),
+    ]),
+    "Students": pa.schema([
+        ("student_id", pa.int32()), ("first_name", pa.string()), ("last_name", pa.string()),
+        ("email", pa.string()), ("enrollment_date", pa.date32()), ("date_of_birth", pa.date32()),
+        ("enrollment_year", pa.int32()),
+    ]),
+    "Enrollments": pa.schema([
+        ("enrollment_id", pa.int32()), ("student_id", pa.int32()), ("course_id", pa.int32()),
+        ("semester", pa.string()), ("grade", pa.int32()),
+    ]),
+}
+
+# table -> (partition column, SQL expression producing it)
+PARTITIONS = {
+    "Students": ("enrollment_year", "EXTRACT(YEAR FROM enrollment_date)::int"),
+    "Enrollments": ("semester", "semester"),
+}
+
+
+# ---------- Export ----------
+
+class _ParquetSink:
+    """File-like target for copy_expert: writes Parquet every `chunk_bytes` of CSV received."""
+
+    def __init__(self, table, root, chunk_bytes):
+        self.schema = SCHEMAS[table]
+        self.root = root
+        self.chunk_bytes = chunk_bytes
+        self.buffer = bytearray()
+        self.chunks = 0
+        self.rows = 0
+        partition = PARTITIONS.get(table)
+        self.partitioning = (ds.partitioning(pa.schema([self.schema.field(partition[0])]), flavor="hive")
+                             if partition else None)
+
+    def write(self, data):
+        # COPY TO STDOUT sends one whole row per message, so the buffer always ends
+        # on a row boundary (a newline inside a quoted value never splits a row)
+        self.buffer += data
+        if len(self.buffer) >= self.chunk_bytes:
+            self._flush()
+
+    def close(self):
+        if self.buffer:
+            self._flush()
+
+    def _flush(self):
+        table = pacsv.read_csv(
+            pa.BufferReader(bytes(self.buffer)),
+            read_options=pacsv.ReadOptions(column_names=self.schema.names),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(column_types=self.schema, strings_can_be_null=True,
+                                                 quoted_strings_can_be_null=False),
+        )
+        self.buffer.clear()
+        ds.write_dataset(table, self.root, format="parquet", partitioning=self.partitioning,
+                         basename_template=f"part-{self.chunks}-{{i}}.parquet",
+                         existing_data_behavior="overwrite_or_ignore")
+        self.chunks += 1
+        self.rows += table.num_rows
+
+
+def export_table(cursor, table, root=PARQUET_DIR, chunk_bytes=32 * 1024 ** 2):
+    """Streams one table into Parquet files under root/<table>; returns the row and chunk counts."""
+    path = Path(root) / table.lower()
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+    partition, expression = PARTITIONS.get(table, (None, None))
+    select = ", ".join(f"{expression} AS {name}" if name == partition else name for name in SCHEMAS[table].names)
+    sink = _ParquetSink(table, path, chunk_bytes)
+    cursor.copy_expert(f"COPY (SELECT {select} FROM {table}) TO STDOUT WITH (FORMAT csv)", sink)
+    sink.close()
+    return {"rows": sink.rows, "chunks": sink.chunks,
+            "bytes": sum(f.stat().st_size for f in path.rglob("*.parquet"))}
+
+
+def export(root=PARQUET_DIR, chunk_bytes=32 * 1024 ** 2):
+    """Exports every table; returns per-table rows / chunks / bytes plus wall time and peak RSS."""
+    conn, cursor = connect_db()
+    report = {"tables": {}}
+    with measure(report):
+        for table in SCHEMAS:
+            report["tables"][table] = export_table(cursor, table, root, chunk_bytes)
+    cursor.close()
+    conn.close()
+    total_mb = sum(t["bytes"] for t in report["tables"].values()) / 1024 ** 2
+    print(f"🗜️ Exported {len(report['tables'])} tables to '{root}' ({total_mb:.1f} MB) in "
+          f"{report['wall_s']:.2f}s, peak RSS {report['peak_rss_mb']:.1f} MB")
+    return report
+
+
+# ---------- In-process engine ----------
+
+def open_datasets(root=PARQUET_DIR):
+    """{table: pyarrow dataset} over the exported files (partition columns typed from SCHEMAS)."""
+    datasets = {}
+    for table, schema in SCHEMAS.items():
+        partition = PARTITIONS.get(table)
+        partitioning = (ds.partitioning(pa.schema([schema.field(partition[0])]), flavor="hive")
+                        if partition else None)
+        datasets[table] = ds.dataset(Path(root) / table.lower(), format="parquet", schema=schema,
+                                     partitioning=partitioning)
+    return datasets
+
+
+def scan(datasets, table, columns, filter=None):
+    """Reads only `columns` of the rows matching `filter` (pushed into the scan) as a DataFrame."""
+    return datasets[table].to_table(columns=columns, filter=filter).to_pandas()
+
+
+def q1_simple_filter(datasets):
+    columns = [name for name in SCHEMAS["Students"].names if name != "enrollment_year"]
+    return scan(datasets, "Students", columns, ds.field("enrollment_year") == 2023)
+
+
+def q2_simple_join_filter(datasets):
+    courses = scan(datasets, "Courses", ["course_id"], ds.field("teacher_id") == 50)
+    enrollments = scan(datasets, "Enrollments", ["student_id"],
+                       ds.field("course_id").isin(courses["course_id"].tolist()))
+    students = scan(datasets, "Students", ["student_id", "email"],
+                    ds.field("student_id").isin(enrollments["student_id"].unique().tolist()))
+    return students[["email"]].drop_duplicates()
+
+
+def q3_multijoin_textsearch(datasets):
+    courses = scan(datasets, "Courses", ["teacher_id"],
+                   pc.match_substring(ds.field("course_name"), "Advanced", ignore_case=True))
+    teachers = scan(datasets, "Teachers", ["teacher_id", "first_name", "last_name"],
+                    ds.field("teacher_id").isin(courses["teacher_id"].unique().tolist()))
+    joined = teachers.merge(courses, on="teacher_id")
+    names = (joined["first_name"] + " " + joined["last_name"]).rename("teacher_name")
+    return names.drop_duplicates().to_frame()
+
+
+def q4_join_aggregation(datasets):
+    departments = scan(datasets, "Departments", ["department_id", "department_name"])
+    teachers = scan(datasets, "Teachers", ["teacher_id", "department_id"])
+    courses = scan(datasets, "Courses", ["course_id", "teacher_id"])
+    joined = departments.merge(teachers, on="department_id").merge(courses, on="teacher_id")
+    return joined.groupby("department_name", as_index=False)["course_id"].count() \
+        .rename(columns={"course_id": "course_count"})
+
+
+def q5_complex_top10(datasets):
+    enrollments = scan(datasets, "Enrollments", ["student_id", "grade"], ds.field("semester") == "Spring 2025")
+    averages = enrollments.groupby("student_id", as_index=False)["grade"].mean() \
+        .rename(columns={"grade": "avg_grade"})
+    top = averages.nlargest(10, "avg_grade")
+    students = scan(datasets, "Students", ["student_id", "first_name", "last_name"],
+                    ds.field("student_id").isin(top["student_id"].tolist()))
+    top = top.merge(students, on="student_id").sort_values("avg_grade", ascending=False)
+    top["student_name"] = top["first_name"] + " " + top["last_name"]
+    return top[["student_name", "avg_grade"]]
+
+
+# Vectorized equivalents of QUERIES
+COLUMNAR_QUERIES = {
+    "Q1_Simple_Filter": q1_simple_filter,
+    "Q2_Simple_Join_Filter": q2_simple_join_filter,
+    "Q3_MultiJoin_TextSearch": q3_multijoin_textsearch,
+    "Q4_Join_Aggregation": q4_join_aggregation,
+    "Q5_Complex_Top10": q5_complex_top10,
+}
+
+
+def benchmark_columnar(datasets, fn, warmup=2, runs=10):
+    """Latency summary, row count and memory growth of one in-process query."""
+    for _ in range(warmup):
+        fn(datasets)
+    latencies = []
+    memory = {}
+    with measure(memory):
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = fn(datasets)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "rows": len(result),
+        "client_ms": summarize(latencies),
+        "client_peak_mb": round(memory["peak_rss_mb"] - memory["start_rss_mb"], 1),
+    }
+
+
+def compare(scale=None, warmup=2, runs=10, root=PARQUET_DIR):
+    """
+    Exports the loaded database, then benchmarks QUERIES on PostgreSQL and
+    their columnar equivalents on the Parquet files.
+
+    Returns:
+        dict with the export report and, per query, both engines' results;
+        saved as results/columnar_<scale>.json when a scale is given
+    """
+    report = {"scale": scale, "export": export(root), "queries": {}}
+
+    conn, cursor = connect_db()
+    postgres = benchmark_suite(cursor, QUERIES, warmup, runs)
+    cursor.close()
+    conn.close()
+
+    datasets = open_datasets(root)
+    print(f"\n{'Query':<26} {'PG p50 ms':>10} {'PQ p50 ms':>10} {'Speedup':>8} "
+          f"{'PG +MB':>7} {'PQ +MB':>7}  Rows")
+    for qname, fn in COLUMNAR_QUERIES.items():
+        pg = postgres[qname]
+        pq = benchmark_columnar(datasets, fn, warmup, runs)
+        report["queries"][qname] = {
+            "postgres": {key: pg[key] for key in ("rows", "client_ms", "server_ms", "client_peak_mb")},
+            "parquet": pq,
+            "rows_match": pg["rows"] == pq["rows"],
+        }
+        print(f"{qname:<26} {pg['client_ms']['p50']:>10.2f} {pq['client_ms']['p50']:>10.2f} "
+              f"{pg['client_ms']['p50'] / max(pq['client_ms']['p50'], 1e-6):>7.1f}x "
+              f"{pg['client_peak_mb']:>7.1f} {pq['client_peak_mb']:>7.1f}  {pq['rows']}"
+              + ("" if pg["rows"] == pq["rows"] else f" (PostgreSQL: {pg['rows']})"))
+
+    if scale is not None:
+        path = RESULTS_DIR / f"columnar_{scale}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Columnar comparison saved to '{path}'")
+    return report
+
+
+if __name__ == "__main__":
+    from snapshots import ensure_dataset
+
+    for scale in [1000, 10000, 100000, 1000000]:
+        print(f"\n=== Columnar engine vs PostgreSQL for {scale} students ===")
+        ensure_dataset(scale, seed=scale)
+        compare(scale)
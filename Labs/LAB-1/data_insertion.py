@@ -14,11 +14,16 @@ Libraries used:
 - Faker: for generating realistic fake data (names, emails, etc.)
 - psycopg2: for PostgreSQL database connection and queries
 - random: to pick random department/course assignments
+- insert_returning: batched multi-row INSERT ... RETURNING for the small
+  tables whose generated ids are needed (one round trip per `page_size` rows)
 - tqdm: for progress bars during large insertions
 """
 
+from contextlib import nullcontext
+
 from faker import Faker
 import psycopg2
+from psycopg2.extras import execute_values
 from random import randint, sample
 from tqdm import tqdm
 
@@ -31,6 +36,35 @@ def connect_db():
         password="12345")
     return conn, conn.cursor()
 
+
+def insert_returning(cursor, table, columns, rows, key, page_size=1000):
+    """
+    Inserts rows with multi-row INSERT ... VALUES ... RETURNING, `page_size`
+    rows per statement, and returns the generated keys in the order of `rows`.
+
+    The keys come from the table's sequence, which hands out increasing
+    values in the order the rows are inserted, so sorting the returned keys
+    puts them back in input order.
+
+    Args:
+        cursor: psycopg2 cursor object
+        table: target table
+        columns: column names, in the order of each row tuple
+        rows: list of row tuples
+        key: sequence-generated column to return (e.g. "teacher_id")
+        page_size: rows per INSERT statement
+
+    Returns:
+        list of generated keys, one per row
+    """
+    keys = execute_values(
+        cursor,
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s RETURNING {key};",
+        rows, page_size=page_size, fetch=True,
+    )
+    return sorted(k[0] for k in keys)
+
+
 def insert_departments(cursor, fake):
     """
     Inserts 10 fixed departments into the Departments table.
@@ -44,15 +78,11 @@ def insert_departments(cursor, fake):
         "Artificial Intelligence", "Cyber Security", "Software Engineering", "Data Analytics",
         "Data Visualization", "Engineering",
     ]
-    for dep in departments:
-        cursor.execute(
-            """
-            INSERT INTO Departments (department_name, building)
-            VALUES (%s, %s)
-            ON CONFLICT DO NOTHING;
-            """,
-            (dep, fake.word().capitalize() + " Building")
-        )
+    execute_values(
+        cursor,
+        "INSERT INTO Departments (department_name, building) VALUES %s ON CONFLICT DO NOTHING;",
+        [(dep, fake.word().capitalize() + " Building") for dep in departments]
+    )
 
 
 def insert_teachers(cursor, fake):
@@ -67,23 +97,19 @@ def insert_teachers(cursor, fake):
     Returns:
         teacher_ids: list of inserted teacher_id values
     """
-    teacher_ids = []
-    for _ in range(100):
-        cursor.execute(
-            """
-            INSERT INTO Teachers (first_name, last_name, email, department_id, hire_date)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING teacher_id;
-            """,
-            (
-                fake.first_name(), fake.last_name(),
-                fake.unique.email(),
-                randint(1, 10),  # department_id between 1–10
-                fake.date_between(start_date="-10y", end_date="today")
-            )
+    rows = [
+        (
+            fake.first_name(), fake.last_name(),
+            fake.unique.email(),
+            randint(1, 10),  # department_id between 1–10
+            fake.date_between(start_date="-10y", end_date="today")
         )
-        teacher_ids.append(cursor.fetchone()[0])
-    return teacher_ids
+        for _ in range(100)
+    ]
+    return insert_returning(
+        cursor, "Teachers", ["first_name", "last_name", "email", "department_id", "hire_date"],
+        rows, "teacher_id"
+    )
 
 
 def insert_courses(cursor, fake, teacher_ids):
@@ -99,22 +125,15 @@ def insert_courses(cursor, fake, teacher_ids):
     Returns:
         course_ids: list of inserted course_id values
     """
-    course_ids = []
-    for _ in range(200):
-        cursor.execute(
-            """
-            INSERT INTO Courses (course_name, credits, teacher_id)
-            VALUES (%s, %s, %s)
-            RETURNING course_id;
-            """,
-            (
-                fake.catch_phrase(),  # generates course-like names
-                randint(2, 5),        # credits between 2–5
-                sample(teacher_ids, 1)[0]  # pick a random teacher
-            )
+    rows = [
+        (
+            fake.catch_phrase(),  # generates course-like names
+            randint(2, 5),        # credits between 2–5
+            sample(teacher_ids, 1)[0]  # pick a random teacher
         )
-        course_ids.append(cursor.fetchone()[0])
-    return course_ids
+        for _ in range(200)
+    ]
+    return insert_returning(cursor, "Courses", ["course_name", "credits", "teacher_id"], rows, "course_id")
 
 
 def insert_students(cursor, fake, scale):
@@ -177,26 +196,45 @@ def insert_enrollments(cursor, student_ids, course_ids):
             )
 
 
-def main(scale=1000):
+def main(scale=1000, profiler=None):
+    """
+    Runs the whole insertion in one transaction.
+
+    Args:
+        scale: number of students
+        profiler: an ingest_profile.IngestProfiler recording every phase
+            (rows, generation vs database time, WAL, RSS) and the commit
+    """
     conn, cursor = connect_db()
     fake = Faker()
+    if profiler is not None:
+        cursor = profiler.attach(cursor)
+    phase = profiler.phase if profiler is not None else lambda name: nullcontext()
 
     print("Inserting Departments...")
-    insert_departments(cursor, fake)
+    with phase("departments"):
+        insert_departments(cursor, fake)
 
     print("Inserting Teachers...")
-    teacher_ids = insert_teachers(cursor, fake)
+    with phase("teachers"):
+        teacher_ids = insert_teachers(cursor, fake)
 
     print("Inserting Courses...")
-    course_ids = insert_courses(cursor, fake, teacher_ids)
+    with phase("courses"):
+        course_ids = insert_courses(cursor, fake, teacher_ids)
 
     print(f"Inserting {scale} Students...")
-    student_ids = insert_students(cursor, fake, scale)
+    with phase("students"):
+        student_ids = insert_students(cursor, fake, scale)
 
     print("Inserting Enrollments...")
-    insert_enrollments(cursor, student_ids, course_ids)
+    with phase("enrollments"):
+        insert_enrollments(cursor, student_ids, course_ids)
 
-    conn.commit()
+    if profiler is not None:
+        profiler.commit(conn)
+    else:
+        conn.commit()
     cursor.close()
     conn.close()
     print("✅ Data insertion complete!")
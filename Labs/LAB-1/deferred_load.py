@@ -0,0 +1,239 @@
+"""
+Deferred Constraint and Index Build for Bulk Loads
+--------------------------------------------------
+table_creation.py declares the primary keys, UNIQUE emails and foreign keys
+up front, so every row the loader copies pays for constraint checks and
+B-tree maintenance, and the secondary indexes are then built one at a time.
+This pipeline defers all of that until the data is in:
+
+1. create: drop the tables and create them bare (columns only).
+2. load: bulk load the dataset (bulk_loader.main).
+3. build, in three phases (statements of a phase run concurrently over
+   `connections` connections, each allowed `parallel_workers` parallel
+   maintenance workers; the phases run in order):
+   - indexes: the unique indexes behind the primary keys and UNIQUE
+     constraints, plus the index advisor's kept indexes (indexing.INDEXES
+     when there is no advice yet), largest tables first
+   - constraints: attach the unique indexes as PRIMARY KEY / UNIQUE
+     constraints and add the foreign keys NOT VALID (catalog-only changes)
+   - validate: VALIDATE every foreign key
+4. maintenance: statistics targets and VACUUM (ANALYZE) (maintenance.run).
+
+Each stage and every statement is timed; the report is saved as
+results/deferred_load_<mode>_<scale>.json. mode="immediate" runs the same
+load with the constraints in place and the indexes built one by one, as a
+baseline.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+
+from benchmark import RESULTS_DIR
+from bulk_loader import main as bulk_load
+from data_insertion import connect_db
+from index_advisor import ADVICE_PATH, load_advised_indexes
+from indexing import INDEXES
+from maintenance import run as run_maintenance
+from table_creation import FOREIGN_KEYS, TABLES, UNIQUE_CONSTRAINTS, create_tables, primary_keys
+
+
+def secondary_indexes():
+    """The advisor's kept indexes, or the hand-picked ones if the advisor has not run yet."""
+    return load_advised_indexes() if ADVICE_PATH.exists() else INDEXES
+
+
+def _table_of(sql):
+    if sql.startswith("ALTER TABLE"):
+        return sql.split()[2]
+    return sql.split(" ON ", 1)[1].split()[0].split("(")[0]
+
+
+def build_phases(partitioning=None, indexes=()):
+    """
+    Returns [(phase, [statements])] that turn bare, loaded tables into the
+    full schema. Statements within a phase do not depend on each other.
+    """
+    build, attach, validate = [], [], []
+
+    for table, name, columns in primary_keys(partitioning):
+        if table == "Enrollments" and partitioning:
+            # ADD ... USING INDEX is not supported on partitioned tables
+            build.append(f"ALTER TABLE {table} ADD CONSTRAINT {name} PRIMARY KEY ({columns});")
+        else:
+            build.append(f"CREATE UNIQUE INDEX {name} ON {table} ({columns});")
+            attach.append(f"ALTER TABLE {table} ADD CONSTRAINT {name} PRIMARY KEY USING INDEX {name};")
+    for table, name, columns in UNIQUE_CONSTRAINTS:
+        build.append(f"CREATE UNIQUE INDEX {name} ON {table} ({columns});")
+        attach.append(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name};")
+    build.extend(indexes)
+
+    for table, name, column, target in FOREIGN_KEYS:
+        fk = f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target}"
+        if table == "Enrollments" and partitioning:
+            # NOT VALID foreign keys are not supported on partitioned tables: add and validate in one go
+            validate.append(fk + ";")
+        else:
+            attach.append(fk + " NOT VALID;")
+            validate.append(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name};")
+
+    return [("indexes", build), ("constraints", attach), ("validate", validate)]
+
+
+def _largest_tables_first(cursor, statements):
+    """Orders statements so that the longest builds start first."""
+    cursor.execute("SELECT lower(t), pg_total_relation_size(t) FROM unnest(%s::text[]) t;", (TABLES,))
+    sizes = dict(cursor.fetchall())
+    return sorted(statements, key=lambda sql: -sizes.get(_table_of(sql).lower(), 0))
+
+
+def run_statements(statements, connections=4, parallel_workers=2, maintenance_work_mem="256MB"):
+    """
+    Runs independent DDL statements over `connections` autocommit connections.
+
+    Returns:
+        list of {"sql", "seconds"} in completion order
+    """
+    tasks = Queue()
+    for sql in statements:
+        tasks.put(sql)
+    timings = []
+
+    def worker():
+        conn, cursor = connect_db()
+        conn.autocommit = True
+        try:
+            cursor.execute("SET max_parallel_maintenance_workers = %s;", (parallel_workers,))
+            cursor.execute("SET maintenance_work_mem = %s;", (maintenance_work_mem,))
+            while True:
+                try:
+                    sql = tasks.get_nowait()
+                except Empty:
+                    return
+                start = time.perf_counter()
+                cursor.execute(sql)
+                timings.append({"sql": sql, "seconds": round(time.perf_counter() - start, 3)})
+        finally:
+            cursor.close()
+            conn.close()
+
+    workers = max(1, min(connections, len(statements)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker) for _ in range(workers)]
+        for future in futures:
+            future.result()
+    return timings
+
+
+def _timed(stages, name, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    stages[name] = {"seconds": round(time.perf_counter() - start, 3)}
+    print(f"⏱️ {name}: {stages[name]['seconds']:.2f}s")
+    return result
+
+
+def recreate_tables(partitioning=None, constraints=False):
+    """Drops the five tables (and their data) and creates them again, bare unless `constraints`."""
+    conn, cursor = connect_db()
+    cursor.execute(f"DROP TABLE IF EXISTS {', '.join(TABLES)} CASCADE;")
+    conn.commit()
+    cursor.close()
+    conn.close()
+    create_tables(partitioning, constraints=constraints)
+
+
+def run_phases(phases, connections=4, parallel_workers=2, maintenance_work_mem="256MB", concurrent=True):
+    """
+    Runs build phases in order.
+
+    Returns:
+        {phase: {"seconds", "statements": [{"sql", "seconds"}]}}
+    """
+    report = {}
+    for phase, statements in phases:
+        start = time.perf_counter()
+        if concurrent and phase != "constraints":
+            conn, cursor = connect_db()
+            statements = _largest_tables_first(cursor, statements)
+            cursor.close()
+            conn.close()
+            timings = run_statements(statements, connections, parallel_workers, maintenance_work_mem)
+        else:
+            # catalog-only ALTERs (and the baseline) run one by one
+            timings = run_statements(statements, 1, parallel_workers, maintenance_work_mem)
+        report[phase] = {"seconds": round(time.perf_counter() - start, 3), "statements": timings}
+        print(f"   {phase}: {len(timings)} statements in {report[phase]['seconds']:.2f}s")
+    return report
+
+
+def run(scale=100000, mode="deferred", partitioning=None, connections=4, parallel_workers=2,
+        maintenance_work_mem="256MB", indexes=None, **load_options):
+    """
+    Runs create -> load -> build for one dataset.
+
+    Args:
+        scale: number of students
+        mode: "deferred" (bare tables, constraints and indexes rebuilt
+            concurrently after the load) or "immediate" (constraints in place
+            while loading, indexes built afterwards on one connection)
+        partitioning: layout of Enrollments, see table_creation.create_enrollments()
+        connections: concurrent connections of the build stage
+        parallel_workers: max_parallel_maintenance_workers per connection
+        maintenance_work_mem: memory per index build
+        indexes: secondary index DDL (defaults to secondary_indexes())
+        load_options: passed to bulk_loader.main
+
+    Returns:
+        report dict (also saved as results/deferred_load_<mode>_<scale>.json)
+    """
+    indexes = secondary_indexes() if indexes is None else indexes
+    if any("gin_trgm_ops" in ddl for ddl in indexes):
+        conn, cursor = connect_db()
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    stages = {}
+    deferred = mode == "deferred"
+    _timed(stages, "create", recreate_tables, partitioning, constraints=not deferred)
+    load_options.setdefault("seed", scale)
+    load_options.setdefault("maintain", False)  # runs after the build instead, on the final schema
+    stats = _timed(stages, "load", bulk_load, scale=scale, **load_options)
+    stages["load"]["tables"] = stats
+
+    start = time.perf_counter()
+    phases = build_phases(partitioning, indexes) if deferred else [("indexes", list(indexes))]
+    stages["build"] = {"phases": run_phases(phases, connections, parallel_workers, maintenance_work_mem, deferred)}
+    stages["build"]["seconds"] = round(time.perf_counter() - start, 3)
+    print(f"⏱️ build: {stages['build']['seconds']:.2f}s")
+    _timed(stages, "maintenance", run_maintenance, estimates=False)
+
+    total = sum(stage["seconds"] for stage in stages.values())
+    report = {
+        "scale": scale,
+        "mode": mode,
+        "partitioning": partitioning,
+        "connections": connections if deferred else 1,
+        "parallel_workers": parallel_workers,
+        "maintenance_work_mem": maintenance_work_mem,
+        "total_seconds": round(total, 3),
+        "stages": stages,
+    }
+    path = RESULTS_DIR / f"deferred_load_{mode}_{scale}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ {mode} load of {scale} students: {total:.2f}s total (report: '{path}')")
+    return report
+
+
+if __name__ == "__main__":
+    reports = [run(scale=100000, mode=mode) for mode in ("immediate", "deferred")]
+    print(f"\n{'Mode':<10} {'Create':>8} {'Load':>8} {'Build':>8} {'Maint':>8} {'Total':>8}")
+    for r in reports:
+        s = r["stages"]
+        print(f"{r['mode']:<10} {s['create']['seconds']:>8.2f} {s['load']['seconds']:>8.2f} "
+              f"{s['build']['seconds']:>8.2f} {s['maintenance']['seconds']:>8.2f} {r['total_seconds']:>8.2f}")
@@ -0,0 +1,361 @@
+"""
+EXPLAIN-driven Index Advisor for University Database
+----------------------------------------------------
+Instead of a fixed, hand-picked list (see indexing.py), derives candidate
+indexes from the plans of every query in QUERIES and keeps only the ones
+that pay off at the current data scale.
+
+Steps:
+1. ANALYZE, then EXPLAIN (VERBOSE, FORMAT JSON) every query.
+2. Walk the plan: report Seq Scans, Sorts and Hashes with their share of the
+   total cost, and collect which columns of each table the query touches.
+3. Propose candidates from scan filters, join conditions and sort keys:
+   - plain B-tree on a filtered / joined / sorted column
+   - expression index for filters on a function (e.g. EXTRACT(year FROM ...))
+   - trigram GIN index for LIKE / ILIKE patterns with a leading wildcard
+   - partial index (WHERE col = const) and covering index (INCLUDE ...)
+4. Build each candidate, re-measure the query's server execution time, and
+   drop the index again unless the plan uses it and it is at least
+   `min_speedup` times faster. Build time and disk size are reported for all.
+
+Kept indexes are saved to results/index_advice.json (see load_advised_indexes).
+"""
+
+import json
+import re
+import statistics
+import time
+
+from benchmark import RESULTS_DIR, explain_analyze
+from data_insertion import connect_db
+from queries import QUERIES
+
+ADVICE_PATH = RESULTS_DIR / "index_advice.json"
+
+_CONDITION_KEYS = ("Hash Cond", "Merge Cond", "Join Filter", "Index Cond", "Recheck Cond")
+_REFERENCE_KEYS = ("Output", "Filter", "Sort Key", "Group Key") + _CONDITION_KEYS
+_QUALIFIED = re.compile(r"\b([a-z_]\w*)\.([a-z_]\w*)\b")
+_CAST = re.compile(r"::[a-z_]+(?: [a-z_]+)*")
+_PAREN_COLUMN = re.compile(r"(?<![\w.])\((\w+)\)")  # "(email)", not the call in "lower(email)"
+
+
+def walk(plan, depth=0):
+    """Yields (node, depth) for every node of a JSON plan tree."""
+    yield plan, depth
+    for child in plan.get("Plans", []):
+        yield from walk(child, depth + 1)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def column_references(plan):
+    """
+    Maps every alias to the columns the query reads from it.
+
+    The Output of a Seq Scan lists every column of the table, so it is
+    ignored; what the rest of the plan asks for is what the query needs.
+    """
+    refs = {}
+    for node, _ in walk(plan):
+        for key in _REFERENCE_KEYS:
+            if key == "Output" and node["Node Type"] == "Seq Scan":
+                continue
+            for text in _as_list(node.get(key, [])):
+                for alias, column in _QUALIFIED.findall(text):
+                    refs.setdefault(alias, set()).add(column)
+    return refs
+
+
+def join_columns(plan):
+    """Maps every alias to the columns it is joined on."""
+    joins = {}
+    for node, _ in walk(plan):
+        for key in _CONDITION_KEYS:
+            for alias, column in _QUALIFIED.findall(node.get(key, "")):
+                joins.setdefault(alias, set()).add(column)
+    return joins
+
+
+def _unwrap(text):
+    """Strips parentheses that enclose the whole text: '((a = 1))' -> 'a = 1'."""
+    text = text.strip()
+    while text.startswith("(") and text.endswith(")"):
+        depth = 0
+        for i, char in enumerate(text):
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            if depth == 0 and i < len(text) - 1:
+                return text  # '(a) = (b)': the first parenthesis closes early
+        text = text[1:-1].strip()
+    return text
+
+
+def normalize(condition, alias):
+    """Drops casts, the alias qualifier and redundant parentheses from a condition."""
+    condition = _CAST.sub("", condition)
+    condition = re.sub(rf"\b{re.escape(alias)}\.", "", condition)
+    while _PAREN_COLUMN.search(condition):
+        condition = _PAREN_COLUMN.sub(r"\1", condition)
+    return _unwrap(condition)
+
+
+def split_conditions(filter_text):
+    """Splits a top-level AND filter into its conditions, each unwrapped."""
+    text = _unwrap(filter_text)
+    conditions, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth == 0 and text.startswith(" AND ", i):
+            conditions.append(text[start:i])
+            start = i + len(" AND ")
+    conditions.append(text[start:])
+    return [_unwrap(c) for c in conditions]
+
+
+def findings(plan):
+    """Lists Seq Scans, Sorts and Hashes with their share of the plan's total cost."""
+    total = plan["Total Cost"] or 1.0
+    found = []
+    for node, _ in walk(plan):
+        if node["Node Type"] in ("Seq Scan", "Sort", "Hash", "Hash Join"):
+            found.append({
+                "node": node["Node Type"],
+                "relation": node.get("Relation Name"),
+                "detail": node.get("Filter") or node.get("Sort Key") or node.get("Hash Cond"),
+                "cost_share": round(node["Total Cost"] / total, 3),
+            })
+    return found
+
+
+def _index_name(table, kind, parts):
+    name = "_".join(re.sub(r"\W+", "_", str(p)).strip("_").lower() for p in parts)
+    return f"idx_adv_{table}_{kind}_{name}"[:63]
+
+
+def _candidate(query, table, kind, ddl_body, name_parts, reason):
+    name = _index_name(table, kind, name_parts)
+    return {
+        "query": query,
+        "table": table,
+        "kind": kind,
+        "column": name_parts[0],
+        "name": name,
+        "ddl": f"CREATE INDEX IF NOT EXISTS {name} ON {table} {ddl_body};",
+        "reason": reason,
+    }
+
+
+def propose(qname, plan, min_cost_share=0.05):
+    """
+    Proposes candidate indexes for one query plan.
+
+    Args:
+        qname: query name (for the report)
+        plan: root node of EXPLAIN (VERBOSE, FORMAT JSON)
+        min_cost_share: scans / sorts cheaper than this share of the total cost are ignored
+
+    Returns:
+        list of candidate dicts (query, table, kind, column, name, ddl, reason)
+    """
+    total = plan["Total Cost"] or 1.0
+    refs = column_references(plan)
+    joins = join_columns(plan)
+    scans = {n["Alias"]: n for n, _ in walk(plan) if n["Node Type"] == "Seq Scan"}
+    candidates = []
+
+    for alias, scan in scans.items():
+        if scan["Total Cost"] / total < min_cost_share:
+            continue
+        table = scan["Relation Name"]
+        used = refs.get(alias, set())
+
+        for condition in split_conditions(scan["Filter"]) if "Filter" in scan else []:
+            cond = normalize(condition, alias)
+
+            like = re.match(r"^(\w+) ~~(\*?) '(%?)(.*)'$", cond)
+            if like:
+                column, leading = like.group(1), like.group(3)
+                if leading:
+                    candidates.append(_candidate(
+                        qname, table, "trgm", f"USING gin ({column} gin_trgm_ops)", [column],
+                        f"{cond}: leading wildcard, B-tree cannot serve it"))
+                else:
+                    ops = "text_pattern_ops" if not like.group(2) else ""
+                    candidates.append(_candidate(
+                        qname, table, "btree", f"({column} {ops})".replace(" )", ")"), [column],
+                        f"{cond}: prefix match"))
+                continue
+
+            expression = re.match(r"^(\w+\(.*\)) (=|<|>|<=|>=) (.+)$", cond)
+            if expression:
+                expr = expression.group(1)
+                candidates.append(_candidate(
+                    qname, table, "expr", f"(({expr}))", re.findall(r"\w+", expr)[-1:],
+                    f"{cond}: filter on an expression, a plain column index is not usable"))
+                continue
+
+            plain = re.match(r"^(\w+) (=|<|>|<=|>=|<>) (.+)$", cond)
+            if not plain or plain.group(2) == "<>":
+                continue
+            column, op, value = plain.groups()
+            others = sorted(used - {column})
+            candidates.append(_candidate(qname, table, "btree", f"({column})", [column], f"{cond}: filter"))
+            if others:
+                candidates.append(_candidate(
+                    qname, table, "covering", f"({column}) INCLUDE ({', '.join(others)})", [column, "incl"],
+                    f"{cond}: filter, index-only scan of {', '.join(others)}"))
+            if op == "=" and value.startswith("'"):
+                keys = sorted(joins.get(alias, set()) - {column}) or others[:1]
+                include = sorted(set(others) - set(keys))
+                if keys:
+                    body = f"({', '.join(keys)})"
+                    if include:
+                        body += f" INCLUDE ({', '.join(include)})"
+                    candidates.append(_candidate(
+                        qname, table, "partial", f"{body} WHERE {column} = {value}", keys + [value],
+                        f"{cond}: constant filter, index only the matching rows"))
+
+        for column in sorted(joins.get(alias, set())):
+            candidates.append(_candidate(
+                qname, table, "btree", f"({column})", [column], f"seq scan joined on {alias}.{column}"))
+
+    for node, _ in walk(plan):
+        if node["Node Type"] != "Sort":
+            continue
+        for key in node.get("Sort Key", []):
+            match = re.match(r"^(\w+)\.(\w+)( DESC)?$", key)
+            if match and match.group(1) in scans and node["Total Cost"] / total >= min_cost_share:
+                table = scans[match.group(1)]["Relation Name"]
+                candidates.append(_candidate(
+                    qname, table, "btree", f"({match.group(2)})", [match.group(2)], f"sort on {key}"))
+    return candidates
+
+
+def leading_columns(cursor, table):
+    """Returns the leading column of every existing index on a table."""
+    cursor.execute("""
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = i.indkey[0]
+        WHERE t.relname = %s;
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def existing_indexes(cursor, table):
+    """Returns the name of every existing index on a table."""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE t.relname = %s;
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def measure(cursor, query, runs=5):
+    """Median server execution time (ms) of a query, plus its last plan."""
+    samples = [explain_analyze(cursor, query) for _ in range(runs)]
+    return statistics.median(s["execution_ms"] for s in samples), samples[-1]["plan"]
+
+
+def evaluate(cursor, candidate, query, runs=5, min_speedup=1.2):
+    """
+    Builds one candidate index, re-measures its query and keeps or drops it.
+
+    Returns:
+        the candidate dict, updated with before_ms, after_ms, speedup,
+        build_s, size_bytes, used and kept
+    """
+    before, _ = measure(cursor, query, runs)
+
+    start = time.perf_counter()
+    cursor.execute(candidate["ddl"])
+    candidate["build_s"] = round(time.perf_counter() - start, 3)
+    cursor.execute(f"ANALYZE {candidate['table']};")
+    cursor.execute("SELECT pg_relation_size(%s);", (candidate["name"],))
+    candidate["size_bytes"] = cursor.fetchone()[0]
+
+    after, plan = measure(cursor, query, runs)
+    candidate["before_ms"] = round(before, 3)
+    candidate["after_ms"] = round(after, 3)
+    candidate["speedup"] = round(before / after, 2) if after else float("inf")
+    candidate["used"] = candidate["name"] in json.dumps(plan)
+    candidate["kept"] = candidate["used"] and candidate["speedup"] >= min_speedup
+
+    if not candidate["kept"]:
+        cursor.execute(f"DROP INDEX IF EXISTS {candidate['name']};")
+    return candidate
+
+
+def advise(queries=QUERIES, runs=5, min_speedup=1.2, min_cost_share=0.05):
+    """
+    Proposes, builds and measures candidate indexes for every query.
+
+    Returns:
+        dict with the plan findings per query and every evaluated candidate
+    """
+    conn, cursor = connect_db()
+    conn.autocommit = True
+    cursor.execute("ANALYZE;")
+
+    report = {"findings": {}, "candidates": []}
+    seen = set()
+    for qname, qtext in queries.items():
+        cursor.execute("EXPLAIN (VERBOSE, FORMAT JSON) " + qtext)
+        plan = cursor.fetchone()[0][0]["Plan"]
+        report["findings"][qname] = findings(plan)
+
+        for candidate in propose(qname, plan, min_cost_share):
+            if candidate["ddl"] in seen:
+                continue
+            seen.add(candidate["ddl"])
+            if candidate["name"] in existing_indexes(cursor, candidate["table"]):
+                print(f"Already built: {candidate['name']}")
+                continue
+            if candidate["kind"] == "btree" and candidate["column"] in leading_columns(cursor, candidate["table"]):
+                continue
+            if candidate["kind"] == "trgm":
+                try:
+                    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+                except Exception as e:
+                    print(f"⚠️ Skipping {candidate['name']}: pg_trgm unavailable ({e.__class__.__name__})")
+                    continue
+            print(f"Evaluating: {candidate['ddl']}")
+            report["candidates"].append(evaluate(cursor, candidate, qtext, runs, min_speedup))
+
+    cursor.close()
+    conn.close()
+    print_report(report)
+    save_advice(report)
+    return report
+
+
+def print_report(report):
+    print(f"\n{'Index':<55} {'Query':<26} {'Before':>10} {'After':>10} {'x':>6} {'Build s':>8} {'Size KB':>9}  Kept")
+    for c in report["candidates"]:
+        print(
+            f"{c['name']:<55} {c['query']:<26} {c['before_ms']:>10.2f} {c['after_ms']:>10.2f} "
+            f"{c['speedup']:>6.2f} {c['build_s']:>8.2f} {c['size_bytes'] / 1024:>9.0f}  {'✅' if c['kept'] else '❌'}"
+        )
+
+
+def save_advice(report, path=ADVICE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Advice saved to '{path}'")
+
+
+def load_advised_indexes(path=ADVICE_PATH):
+    """Returns the DDL of every kept index from the last advisor run."""
+    with open(path) as f:
+        report = json.load(f)
+    return [c["ddl"] for c in report["candidates"] if c["kept"]]
+
+
+if __name__ == "__main__":
+    advise()
@@ -0,0 +1,165 @@
+"""
+Per-phase Ingest Instrumentation for data_insertion
+---------------------------------------------------
+tqdm bars show how far a load is, not why it is slow. This module runs
+data_insertion.main with a profiler that splits every phase (one per insert
+function, plus the final commit) into:
+
+- rows generated: rows handed to the database (statement parameters and
+  execute_values rows)
+- rows written: rows the server reports inserted (cursor.rowcount)
+- database time: time spent inside execute / fetch / COPY calls, i.e. the
+  network round trips plus the server's work
+- generation time: the rest of the phase (Faker, random, Python loops)
+- commit latency
+- WAL bytes: pg_current_wal_lsn() delta over the phase (cluster-wide, so
+  other sessions' writes are counted too)
+- client RSS at the start of the phase and its peak during it
+
+A phase where generation time dominates is bound by Faker; one where
+database time dominates with little WAL per row is bound by round trips;
+one with database time and a high WAL rate is bound by the server.
+
+The report is saved as results/ingest_<scale>.json.
+
+Usage:
+    python ingest_profile.py --scale 10000
+"""
+
+import argparse
+import json
+import time
+from contextlib import contextmanager
+
+from benchmark import RESULTS_DIR, measure
+
+_TIMED_METHODS = ("execute", "executemany", "fetchone", "fetchmany", "fetchall",
+                  "copy_expert", "copy_from", "copy_to")
+
+
+class TimedCursor:
+    """Cursor proxy that accumulates time spent in database calls and counts rows sent and written."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.db_s = 0.0
+        self.rows_generated = 0
+        self.rows_written = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if name not in _TIMED_METHODS:
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self.db_s += time.perf_counter() - start
+                self._count(name, args)
+        return timed
+
+    def _count(self, name, args):
+        if name.startswith("fetch"):
+            return
+        if name == "executemany":
+            self.rows_generated += len(args[1])
+        elif name == "execute" and len(args) > 1 and args[1] is not None:
+            self.rows_generated += 1
+        status = (self._cursor.statusmessage or "").split()
+        if self._cursor.rowcount > 0 and status and status[0] in ("INSERT", "COPY"):
+            self.rows_written += self._cursor.rowcount
+
+    def mogrify(self, *args, **kwargs):
+        # execute_values mogrifies every row before sending a page
+        self.rows_generated += 1
+        return self._cursor.mogrify(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class IngestProfiler:
+    """Records one entry per load phase; pass it to data_insertion.main(profiler=...)."""
+
+    def __init__(self):
+        self.phases = {}
+        self.cursor = None
+        self._raw = None
+
+    def attach(self, cursor):
+        """Returns the TimedCursor the load must use instead of `cursor`."""
+        self._raw = cursor
+        self.cursor = TimedCursor(cursor)
+        return self.cursor
+
+    def _wal_lsn(self):
+        self._raw.execute("SELECT pg_current_wal_lsn();")
+        return self._raw.fetchone()[0]
+
+    def _wal_bytes(self, start_lsn):
+        self._raw.execute("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s);", (start_lsn,))
+        return int(self._raw.fetchone()[0])
+
+    @contextmanager
+    def phase(self, name):
+        cursor = self.cursor
+        db_s, generated, written = cursor.db_s, cursor.rows_generated, cursor.rows_written
+        start_lsn = self._wal_lsn()
+        record = {}
+        with measure(record):
+            yield record
+        db = cursor.db_s - db_s
+        record.update(
+            rows_generated=cursor.rows_generated - generated,
+            rows_written=cursor.rows_written - written,
+            db_s=round(db, 3),
+            generation_s=round(max(record["wall_s"] - db, 0.0), 3),
+            wal_bytes=self._wal_bytes(start_lsn),
+        )
+        self.phases[name] = record
+
+    def commit(self, conn):
+        """Commits `conn` as its own phase, recording the commit latency (WAL flush included)."""
+        with self.phase("commit") as record:
+            start = time.perf_counter()
+            conn.commit()
+            record["commit_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def print_summary(self):
+        print(f"\n{'Phase':<13} {'Generated':>10} {'Written':>10} {'Wall s':>8} {'Gen s':>8} {'DB s':>8} "
+              f"{'Rows/s':>9} {'WAL MB':>8} {'RSS MB':>8}")
+        for name, p in self.phases.items():
+            rate = p["rows_written"] / p["wall_s"] if p["wall_s"] else 0.0
+            print(f"{name:<13} {p['rows_generated']:>10} {p['rows_written']:>10} {p['wall_s']:>8.2f} "
+                  f"{p['generation_s']:>8.2f} {p['db_s']:>8.2f} {rate:>9.0f} "
+                  f"{p['wal_bytes'] / 1024 ** 2:>8.1f} {p['peak_rss_mb']:>8.1f}")
+        if "commit" in self.phases:
+            print(f"Commit latency: {self.phases['commit']['commit_ms']:.2f} ms")
+
+    def save(self, scale, path=None):
+        path = path or RESULTS_DIR / f"ingest_{scale}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"scale": scale, "phases": self.phases}, f, indent=2)
+        print(f"📄 Ingest profile saved to '{path}'")
+        return path
+
+
+def run(scale=1000):
+    """Loads `scale` students with data_insertion.main under the profiler; returns the phases."""
+    from data_insertion import main
+
+    profiler = IngestProfiler()
+    main(scale=scale, profiler=profiler)
+    profiler.print_summary()
+    profiler.save(scale)
+    return profiler.phases
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile data_insertion.main phase by phase")
+    parser.add_argument("--scale", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.scale)
@@ -0,0 +1,209 @@
+"""
+Concurrent Throughput Benchmark for University Database Queries
+---------------------------------------------------------------
+Runs the QUERIES workload from N concurrent clients instead of one query at
+a time on one connection, and ramps N to find where throughput saturates.
+
+- "threads" mode: N client threads share a psycopg2 ThreadedConnectionPool of
+  `pool_size` connections; a client borrows a connection for every query
+  (and waits when all of them are in use, as an application pool would).
+- "processes" mode: N client processes, each with its own connection, so the
+  Python client can never be the bottleneck.
+
+Each client picks queries from a weighted mix for `duration` seconds. Every
+level reports QPS and latency percentiles, overall and per query.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Barrier, Pool
+from random import Random
+
+from psycopg2.pool import ThreadedConnectionPool
+
+from benchmark import RESULTS_DIR, summarize
+from data_insertion import connect_db
+from queries import QUERIES
+
+DB_PARAMS = dict(host="localhost", database="university_db", user="postgres", password="12345")
+CONCURRENCY = [1, 2, 4, 8, 16, 32, 64]
+
+
+class BlockingPool:
+    """ThreadedConnectionPool that waits for a free connection instead of raising PoolError."""
+
+    def __init__(self, size):
+        self.pool = ThreadedConnectionPool(1, size, **DB_PARAMS)
+        self.available = threading.BoundedSemaphore(size)
+
+    def run(self, query):
+        with self.available:
+            conn = self.pool.getconn()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query)
+                    cursor.fetchall()
+                conn.rollback()
+            finally:
+                self.pool.putconn(conn)
+
+    def close(self):
+        self.pool.closeall()
+
+
+def _picker(mix, seed):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    rng = Random(seed)
+    return lambda: rng.choices(names, weights)[0]
+
+
+def _client_loop(run, mix, deadline, seed):
+    """Runs queries from the mix until the deadline; returns [(qname, latency_ms)]."""
+    pick = _picker(mix, seed)
+    samples = []
+    while time.perf_counter() < deadline:
+        qname = pick()
+        start = time.perf_counter()
+        run(QUERIES[qname])
+        samples.append((qname, (time.perf_counter() - start) * 1000))
+    return samples
+
+
+_start_barrier = None
+
+
+def _init_process_client(barrier):
+    global _start_barrier
+    _start_barrier = barrier
+
+
+def _process_client(args):
+    mix, duration, seed = args
+    conn, cursor = connect_db()
+
+    def run(query):
+        cursor.execute(query)
+        cursor.fetchall()
+
+    try:
+        # every client is connected before anyone starts the clock
+        _start_barrier.wait(timeout=120)
+        return _client_loop(run, mix, time.perf_counter() + duration, seed)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run_level(clients, mix, duration=10, mode="threads", pool_size=None, seed=0):
+    """
+    Runs the workload at one concurrency level.
+
+    Args:
+        clients: number of concurrent clients
+        mix: {query name: weight}
+        duration: seconds each client keeps issuing queries
+        mode: "threads" (shared connection pool) or "processes"
+        pool_size: connections in the pool (threads mode, defaults to clients)
+        seed: base seed of the clients' query choices
+
+    Process start-up and connecting are not timed: the clock starts once
+    every client is ready, so both modes measure the same window.
+
+    Returns:
+        dict with clients, queries, qps, latency summary (None if no query
+        completed) and per-query summaries
+    """
+    if mode == "processes":
+        barrier = Barrier(clients + 1)
+        with Pool(clients, initializer=_init_process_client, initargs=(barrier,)) as pool:
+            pending = pool.map_async(_process_client, [(mix, duration, seed + i) for i in range(clients)])
+            barrier.wait(timeout=120)
+            start = time.perf_counter()
+            per_client = pending.get()
+    else:
+        pool = BlockingPool(pool_size or clients)
+        start = time.perf_counter()
+        deadline = start + duration
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            futures = [executor.submit(_client_loop, pool.run, mix, deadline, seed + i) for i in range(clients)]
+            per_client = [f.result() for f in futures]
+        pool.close()
+    elapsed = time.perf_counter() - start
+
+    samples = [s for client in per_client for s in client]
+    by_query = {}
+    for qname, latency in samples:
+        by_query.setdefault(qname, []).append(latency)
+
+    return {
+        "clients": clients,
+        "queries": len(samples),
+        "qps": round(len(samples) / elapsed, 2),
+        "latency_ms": summarize([latency for _, latency in samples]) if samples else None,
+        "per_query": {q: dict(summarize(v), count=len(v)) for q, v in by_query.items()},
+    }
+
+
+def saturation_point(levels, min_gain=0.1):
+    """First concurrency level after which adding clients raises QPS by less than `min_gain`."""
+    for previous, current in zip(levels, levels[1:]):
+        if current["qps"] < previous["qps"] * (1 + min_gain):
+            return previous["clients"]
+    return levels[-1]["clients"]
+
+
+def ramp(scale, concurrency=CONCURRENCY, mix=None, duration=10, mode="threads", pool_size=None):
+    """
+    Ramps the number of clients and reports where throughput saturates.
+
+    Args:
+        scale: number of students currently loaded (used to label the results)
+        concurrency: client counts to run, in order
+        mix: {query name: weight}; defaults to every query with weight 1
+
+    Returns:
+        dict with every level and the saturation point; also saved as
+        results/load_<mode>_<scale>.json
+    """
+    mix = mix or {qname: 1 for qname in QUERIES}
+    levels = []
+    for clients in concurrency:
+        level = run_level(clients, mix, duration, mode, pool_size)
+        levels.append(level)
+        latency = level["latency_ms"]
+        if latency is None:
+            print(f"{clients:>3} clients: no query completed within {duration}s")
+            continue
+        print(
+            f"{clients:>3} clients: {level['qps']:>9.2f} QPS | p50 {latency['p50']:.2f} ms, "
+            f"p95 {latency['p95']:.2f} ms, p99 {latency['p99']:.2f} ms"
+        )
+
+    result = {
+        "scale": scale,
+        "mode": mode,
+        "duration": duration,
+        "mix": mix,
+        "levels": levels,
+        "saturates_at": saturation_point(levels),
+    }
+    print(f"Throughput saturates at {result['saturates_at']} clients ({scale} students, {mode})")
+
+    path = RESULTS_DIR / f"load_{mode}_{scale}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"📄 Results saved to '{path}'")
+    return result
+
+
+if __name__ == "__main__":
+    from snapshots import ensure_dataset
+
+    for scale in [1000, 10000, 100000, 1000000]:
+        print(f"\n=== Load test for {scale} students ===")
+        ensure_dataset(scale, seed=scale)
+        ramp(scale)
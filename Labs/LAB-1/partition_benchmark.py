@@ -0,0 +1,96 @@
+"""
+Partitioning Benchmark for Enrollments
+--------------------------------------
+Measures how partitioning Enrollments by semester (or by semester and a hash
+of student_id) changes Q2 and Q5, with and without per-partition indexes.
+
+For every scale and layout:
+1. Recreate Enrollments with the layout (table_creation.recreate_enrollments).
+2. Reload the dataset with the bulk loader, which copies straight into the
+   semester partitions, then ANALYZE.
+3. Benchmark Q2 / Q5 without indexes, then with indexes on the partitioned
+   parent (PostgreSQL creates one per partition), and record which
+   partitions each plan actually scanned (partition pruning).
+
+Results are saved as results/benchmark_partition_<layout>_<indexes>_<scale>.json.
+Afterwards Enrollments is unpartitioned again and the dataset is reloaded at
+the number of students it held before, so every table is consistent.
+"""
+
+from benchmark import benchmark_suite, save_results
+from bulk_loader import main as bulk_load
+from data_insertion import connect_db
+from index_advisor import walk
+from queries import QUERIES
+from refresh import refresh
+from table_creation import recreate_enrollments
+
+LAYOUTS = [None, "semester", "semester_hash"]
+
+PARTITION_QUERIES = {q: QUERIES[q] for q in ("Q2_Simple_Join_Filter", "Q5_Complex_Top10")}
+
+PARTITION_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_enrollments_student ON Enrollments(student_id);",
+    "CREATE INDEX IF NOT EXISTS idx_enrollments_course ON Enrollments(course_id);",
+]
+
+
+def scanned_partitions(plan):
+    """Names of the Enrollments tables / partitions a plan reads."""
+    return sorted({
+        node["Relation Name"] for node, _ in walk(plan)
+        if node.get("Relation Name", "").startswith("enrollments")
+    })
+
+
+def _student_count():
+    conn, cursor = connect_db()
+    cursor.execute("SELECT COUNT(*) FROM Students;")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return count
+
+
+def run(scales=(100000, 1000000), layouts=LAYOUTS, warmup=2, runs=10):
+    original_scale = _student_count()
+    summary = []
+    for scale in scales:
+        for layout in layouts:
+            print(f"\n=== {scale} students, partitioning: {layout or 'none'} ===")
+            recreate_enrollments(layout)
+            refresh()
+            bulk_load(scale=scale, seed=scale)
+
+            conn, cursor = connect_db()
+            conn.autocommit = True
+            cursor.execute("ANALYZE;")
+            for indexed in (False, True):
+                if indexed:
+                    for idx in PARTITION_INDEXES:
+                        cursor.execute(idx)
+                    cursor.execute("ANALYZE Enrollments;")
+                results = benchmark_suite(cursor, PARTITION_QUERIES, warmup, runs)
+                for qname, result in results.items():
+                    result["partitions_scanned"] = scanned_partitions(result["plan"]["Plan"])
+                    summary.append((scale, layout or "none", indexed, qname,
+                                    result["client_ms"]["p50"], len(result["partitions_scanned"])))
+                label = f"partition_{layout or 'none'}_{'indexed' if indexed else 'noindex'}"
+                save_results(results, scale, label, warmup, runs)
+            cursor.close()
+            conn.close()
+
+    # back to the unpartitioned layout with a full dataset, not an empty Enrollments
+    recreate_enrollments(None)
+    refresh()
+    if original_scale:
+        bulk_load(scale=original_scale, seed=original_scale)
+
+    print(f"\n{'Scale':>8} {'Layout':<14} {'Indexes':<8} {'Query':<24} {'p50 ms':>10} {'Scanned':>8}")
+    for scale, layout, indexed, qname, p50, scanned in summary:
+        print(f"{scale:>8} {layout:<14} {'yes' if indexed else 'no':<8} {qname:<24} {p50:>10.2f} {scanned:>8}")
+    return summary
+
+
+if __name__ == "__main__":
+    run()
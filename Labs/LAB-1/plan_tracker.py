@@ -0,0 +1,180 @@
+"""
+Plan Regression Tracker
+-----------------------
+Every benchmark run stores each query's plan with a normalized shape and its
+fingerprint (benchmark.plan_shape / plan_fingerprint). This module reads all
+stored runs (results/benchmark_*.json and the sweep store) and flags every
+query whose plan shape differs:
+
+- between consecutive scales of the same label (e.g. 10k -> 100k students)
+- between labels at the same scale (index sets, partition layouts, ...)
+
+Each change is described by the operators that disappeared and appeared
+(e.g. "Nested Loop -> Hash Join", "Index Scan on enrollments -> Seq Scan on
+enrollments") and printed with both plans side by side, estimated and actual
+rows on every node, next to the p50 latency of each run.
+
+Changes are saved to results/plan_changes.json.
+"""
+
+import json
+from collections import Counter
+from itertools import zip_longest
+from pathlib import Path
+
+from benchmark import RESULTS_DIR, load_results, plan_fingerprint
+
+CHANGES_PATH = RESULTS_DIR / "plan_changes.json"
+
+
+def collect(output_dir=RESULTS_DIR):
+    """
+    Every stored (label, scale, query) run.
+
+    Returns:
+        list of dicts with label, scale, query, fingerprint, plan and p50_ms
+    """
+    runs = []
+
+    def add(label, scale, qname, result):
+        plan = result["plan"]["Plan"]
+        runs.append({
+            "label": label,
+            "scale": int(scale),
+            "query": qname,
+            # runs saved before fingerprints existed get one from their plan
+            "fingerprint": result.get("plan_fingerprint") or plan_fingerprint(plan),
+            "plan": plan,
+            "p50_ms": result["client_ms"]["p50"],
+        })
+
+    for document in load_results(output_dir=output_dir):
+        for qname, result in document["queries"].items():
+            add(document["label"], document["scale"], qname, result)
+
+    sweep_path = Path(output_dir) / "sweep.json"
+    if sweep_path.exists():
+        with open(sweep_path) as f:
+            store = json.load(f)
+        for scale, entry in store["scales"].items():
+            for stage, record in entry["stages"].items():
+                if stage.startswith("benchmark_") and record.get("done"):
+                    for qname, result in record["queries"].items():
+                        add("sweep_" + stage[len("benchmark_"):], scale, qname, result)
+    return runs
+
+
+def _operator(node):
+    """'[Parallel ][Partial ]Node Type[ on relation]' of one plan node."""
+    name = node["Node Type"]
+    if node.get("Partial Mode", "Simple") != "Simple":
+        name = f"{node['Partial Mode']} {name}"
+    if node.get("Parallel Aware"):
+        name = "Parallel " + name
+    if "Relation Name" in node:
+        name += f" on {node['Relation Name']}"
+    return name
+
+
+def _operators(plan):
+    """Counter of the operators of a plan tree."""
+    ops = Counter()
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        ops[_operator(node)] += 1
+        stack.extend(node.get("Plans", []))
+    return ops
+
+
+def describe_change(before, after):
+    """Operators that disappeared and appeared between two plans, e.g. 'Nested Loop -> Hash Join'."""
+    a, b = _operators(before), _operators(after)
+    removed = ", ".join(sorted((a - b).elements())) or "-"
+    added = ", ".join(sorted((b - a).elements())) or "-"
+    return f"{removed} -> {added}"
+
+
+def render(plan, width=64):
+    """One line per node: operator, relation / index, estimated and actual rows."""
+    lines = []
+
+    def visit(node, depth):
+        text = "  " * depth + _operator(node)
+        if "Index Name" in node:
+            text += f" using {node['Index Name']}"
+        rows = f" est={node['Plan Rows']}"
+        if "Actual Rows" in node:
+            rows += f" act={node['Actual Rows']}"
+            if node.get("Actual Loops", 1) != 1:
+                rows += f"x{node['Actual Loops']}"
+        text = text[:width - len(rows)] + rows
+        lines.append(text)
+        for child in node.get("Plans", []):
+            visit(child, depth + 1)
+
+    visit(plan, 0)
+    return lines
+
+
+def side_by_side(before, after, width=64):
+    left, right = render(before, width), render(after, width)
+    return [f"{l:<{width}} | {r}" for l, r in zip_longest(left, right, fillvalue="")]
+
+
+def find_changes(runs):
+    """Pairs of runs of the same query whose plan fingerprints differ."""
+    changes = []
+
+    def compare(kind, a, b):
+        if a["fingerprint"] != b["fingerprint"]:
+            changes.append({
+                "kind": kind,
+                "query": a["query"],
+                "before": {k: a[k] for k in ("label", "scale", "fingerprint", "p50_ms")},
+                "after": {k: b[k] for k in ("label", "scale", "fingerprint", "p50_ms")},
+                "change": describe_change(a["plan"], b["plan"]),
+                "side_by_side": side_by_side(a["plan"], b["plan"]),
+            })
+
+    by_label, by_scale = {}, {}
+    for run in runs:
+        by_label.setdefault((run["label"], run["query"]), []).append(run)
+        by_scale.setdefault((run["scale"], run["query"]), []).append(run)
+
+    for group in by_label.values():
+        group.sort(key=lambda r: r["scale"])
+        for a, b in zip(group, group[1:]):
+            compare("scale", a, b)
+    for group in by_scale.values():
+        group.sort(key=lambda r: r["label"])
+        for i, a in enumerate(group):
+            for b in group[i + 1:]:
+                compare("label", a, b)
+    return changes
+
+
+def report(changes):
+    for c in changes:
+        a, b = c["before"], c["after"]
+        print(f"\n⚠️ {c['query']}: plan changed between {a['label']} @ {a['scale']} "
+              f"({a['p50_ms']:.2f} ms) and {b['label']} @ {b['scale']} ({b['p50_ms']:.2f} ms)")
+        print(f"   {c['change']}")
+        for line in c["side_by_side"]:
+            print("   " + line)
+    print(f"\n{len(changes)} plan change(s) found")
+
+
+def track(output_dir=RESULTS_DIR, path=CHANGES_PATH):
+    """Finds, prints and saves every plan change among the stored runs."""
+    changes = find_changes(collect(output_dir))
+    report(changes)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(changes, f, indent=2)
+    print(f"📄 Plan changes saved to '{path}'")
+    return changes
+
+
+if __name__ == "__main__":
+    track()
@@ -1,10 +1,9 @@
 import psycopg2
-import time
-import statistics
 import csv
 from pathlib import Path
-from data_insertion import main as insert_data, verify_insertion
-from refresh import refresh
+from data_insertion import verify_insertion
+from snapshots import ensure_dataset
+from benchmark import benchmark_suite, save_results, load_results
 
 
 def connect_db():
@@ -59,29 +58,26 @@ QUERIES = {
 }
 
 
-def benchmark_query(cursor, query, runs=3):
-    times = []
-    for _ in range(runs):
-        start = time.perf_counter()
-        cursor.execute(query)
-        cursor.fetchall()
-        end = time.perf_counter()
-        times.append((end - start) * 1000)  # ms
-    return statistics.mean(times)
+def run_benchmarks(runs=10, warmup=2, scale=None, label="no_index", fetch="all", itersize=2000, cache=None):
+    """
+    Benchmarks every query in QUERIES (see benchmark.py for the statistics).
+    fetch="stream" reads results through a server-side cursor, `itersize`
+    rows at a time; a result_cache.ResultCache serves repeated queries from
+    the client.
 
+    If `scale` is given, the full results are saved as JSON under results/.
 
-def run_benchmarks(runs=3):
+    Returns:
+        dict of {query name: client p50 in ms}
+    """
     conn, cursor = connect_db()
-    results = {}
-
-    for qname, qtext in QUERIES.items():
-        avg_time = benchmark_query(cursor, qtext, runs)
-        results[qname] = round(avg_time, 2)
-        print(f"{qname}: {avg_time:.2f} ms (avg over {runs} runs)")
-
+    results = benchmark_suite(cursor, QUERIES, warmup, runs, fetch, itersize, cache)
     cursor.close()
     conn.close()
-    return results
+
+    if scale is not None:
+        save_results(results, scale, label, warmup, runs)
+    return {qname: result["client_ms"]["p50"] for qname, result in results.items()}
 
 
 def save_results_to_csv(results, scale, filename="query_results.csv"):
@@ -96,47 +92,29 @@ def save_results_to_csv(results, scale, filename="query_results.csv"):
         writer.writerow(row)
 
 if __name__ == "__main__":
-    all_results = []
-    scales = [1000, 10000, 100000, 1000000]
-
-    # for scale in scales:
-    #     print(f"\n=== Running experiment for {scale} students ===")
-    #     refresh()
-    #     print(f"Inserting {scale} students...")
-    #     insert_data(scale=scale)
-    #     print("Verifying insertion...")
-    #     verify_insertion()
-    #     print("Running benchmarks...")
-    #     results = run_benchmarks(runs=3)
-    #     row = {"Scale": scale}
-    #     row.update(results)
-    #     all_results.append(row)
-
     import pandas as pd
 
-    df = pd.DataFrame(all_results)
-    print("\nFinal Results:")
-    print(df)
-    df.to_csv("query_results.csv", index=False)
-    df.to_excel("query_results.xlsx", index=False)
-    import pandas as pd
-
-    # Create the DataFrame with Scale as a regular column
-    data = {
-        'Scale': [1000, 10000, 100000, 1000000],
-        'Q1_simple_Filter': [1.19, 6.40, 69.71, 756.10],
-        'Q2_simple_Join_Filter': [2.02, 1.69, 191.07, 4634.75],
-        'Q3_MultiJoin_TextSearch': [1.27, 1.31, 24.18, 65.14],
-        'Q4_Join_Aggregation': [0.71, 1.24, 3.20, 6.96],
-        'Q5_Complex_Top10': [2.70, 22.34, 229.22, 3957.74]
-    }
+    scales = [1000, 10000, 100000, 1000000]
 
-    df = pd.DataFrame(data)
+    for scale in scales:
+        print(f"\n=== Running experiment for {scale} students ===")
+        print(f"Loading {scale} students (restored from a snapshot when available)...")
+        ensure_dataset(scale, seed=scale)
+        print("Verifying insertion...")
+        verify_insertion()
+        print("Running benchmarks...")
+        run_benchmarks(runs=10, warmup=2, scale=scale)
+
+    rows = []
+    for document in load_results(label="no_index"):
+        row = {"Scale": document["scale"]}
+        row.update({q: r["client_ms"]["p50"] for q, r in document["queries"].items()})
+        rows.append(row)
+
+    df = pd.DataFrame(rows)
+    print("\nFinal Results (p50 ms):")
+    print(df)
 
-    # Save to Excel file
     excel_filename = 'query_performance_results.xlsx'
     df.to_excel(excel_filename, sheet_name='Performance Results', index=False)
-
-    print(f"DataFrame created successfully!")
-    print(df)
-    print(f"\nData saved to '{excel_filename}'")
\ No newline at end of file
+    print(f"\nData saved to '{excel_filename}'")
@@ -1,4 +1,5 @@
 import psycopg2
+from aggregates import truncate_summary_tables
 
 def refresh():
     conn = psycopg2.connect(
@@ -12,6 +13,7 @@ def refresh():
         TRUNCATE TABLE Enrollments, Students, Courses, Teachers, Departments 
         RESTART IDENTITY CASCADE;
     """)
+    truncate_summary_tables(cursor)
     conn.commit()
     cursor.close()
     conn.close()
@@ -0,0 +1,224 @@
+"""
+Versioned Result Cache for Repeated Queries
+-------------------------------------------
+Dashboards re-run the same QUERIES while the data rarely changes. This cache
+keeps their results on the client and serves repeats without touching the
+tables, while never returning a stale result:
+
+- TableVersions holds a change counter per table. Statement-level triggers
+  bump it on every INSERT / UPDATE / DELETE / TRUNCATE, and the bulk loader
+  bumps it after a load (COPY straight into Enrollments partitions bypasses
+  the triggers on the parent table).
+- The tables a query reads are taken once from its EXPLAIN plan (partitions
+  count as their parent table).
+- An entry is keyed by (query, params) and stamped with the database's oid
+  and the versions of only the tables it reads: a write to Students
+  invalidates the queries that read Students and nothing else, and a
+  database restored from a snapshot never matches entries of the old one.
+- Dropping a table (the loaders recreate them with DROP ... CASCADE) drops
+  its trigger too. Every lookup checks that the triggers of the tables it
+  reads exist and bypasses the cache until install() has recreated them;
+  install() also bumps every counter, since writes in between went uncounted.
+- Entries are evicted least-recently-used once the cache holds more than
+  `max_entries` results or `max_bytes` of pickled rows.
+
+Each lookup costs one round trip for the versions instead of running the
+query. Queries that read a table without a counter are never cached.
+"""
+
+import pickle
+from collections import OrderedDict
+
+from benchmark import benchmark_suite, save_results
+from data_insertion import connect_db
+from index_advisor import walk
+from queries import QUERIES
+from table_creation import TABLES
+
+
+def install(cursor):
+    """
+    Creates TableVersions and the version-bumping triggers on the five tables
+    (idempotent). Bumps every counter, as writes made while a trigger was
+    missing were not counted.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS TableVersions (
+            table_name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        );
+    """)
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO TableVersions (table_name, version) VALUES (lower(TG_TABLE_NAME), 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = TableVersions.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in TABLES:
+        cursor.execute("""
+            INSERT INTO TableVersions (table_name, version) VALUES (%s, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = TableVersions.version + 1;
+        """, (table.lower(),))
+        cursor.execute(f"""
+            CREATE OR REPLACE TRIGGER {table.lower()}_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+        """)
+
+
+def bump_versions(cursor, tables):
+    """Bumps the change counters of `tables`, if the cache's TableVersions exists (used by the loader)."""
+    cursor.execute("SELECT to_regclass('tableversions') IS NOT NULL;")
+    if cursor.fetchone()[0]:
+        cursor.execute("""
+            INSERT INTO TableVersions (table_name, version)
+            SELECT lower(t), 1 FROM unnest(%s::text[]) t
+            ON CONFLICT (table_name) DO UPDATE SET version = TableVersions.version + 1;
+        """, (list(tables),))
+
+
+class ResultCache:
+    """Client-side LRU cache of query results, invalidated by per-table change counters."""
+
+    def __init__(self, max_entries=256, max_bytes=256 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (query, params) -> (stamp, rows, size)
+        self.tables = {}              # query -> tables it reads (None: not cacheable)
+        self.size = 0
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0, "evicted": 0, "uncacheable": 0}
+
+    def tables_read(self, cursor, query, params=None):
+        """Root tables a query reads according to its plan; memoized per query text."""
+        if query not in self.tables:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            relations = {node["Relation Name"] for node, _ in walk(cursor.fetchone()[0][0]["Plan"])
+                         if "Relation Name" in node}
+            cursor.execute("""
+                SELECT DISTINCT coalesce(pg_partition_root(c.oid), c.oid)::regclass::text
+                FROM pg_class c
+                WHERE c.relname = ANY(%s);
+            """, (list(relations),))
+            tables = sorted(row[0] for row in cursor.fetchall())
+            tracked = {t.lower() for t in TABLES}
+            self.tables[query] = tuple(tables) if set(tables) <= tracked else None
+        return self.tables[query]
+
+    def stamp(self, cursor, tables):
+        """
+        (database oid, versions of `tables`) as of now, or None when a table
+        has lost its version trigger (it was dropped and recreated).
+        """
+        cursor.execute("""
+            SELECT (SELECT oid FROM pg_database WHERE datname = current_database()),
+                   array_agg(version ORDER BY table_name),
+                   (SELECT count(*) FROM pg_trigger
+                    WHERE tgname = ANY(SELECT t || '_version' FROM unnest(%s::text[]) t)
+                      AND tgrelid::regclass::text = left(tgname, -length('_version')))
+            FROM TableVersions
+            WHERE table_name = ANY(%s);
+        """, (list(tables), list(tables)))
+        oid, versions, triggers = cursor.fetchone()
+        if triggers < len(tables):
+            return None
+        return oid, tuple(versions or ())
+
+    def fetch(self, cursor, query, params=None):
+        """Returns the rows of a query, from the cache when none of the tables it reads has changed."""
+        tables = self.tables_read(cursor, query, params)
+        if tables is None:
+            self.stats["uncacheable"] += 1
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+        key = (query, repr(params))
+        stamp = self.stamp(cursor, tables)
+        if stamp is None:
+            # writes are not being counted: no cached result can be trusted
+            self.stats["uncacheable"] += 1
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] == stamp:
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            self._remove(key)
+            self.stats["invalidated"] += 1
+
+        self.stats["misses"] += 1
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        size = len(pickle.dumps(rows, pickle.HIGHEST_PROTOCOL))
+        if size <= self.max_bytes:
+            self.entries[key] = (stamp, rows, size)
+            self.size += size
+            self._evict()
+        return rows
+
+    def hit_ratio(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def _remove(self, key):
+        self.size -= self.entries.pop(key)[2]
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+            self.stats["evicted"] += 1
+
+
+def compare(scale=None, warmup=2, runs=10):
+    """
+    Benchmarks QUERIES with the cache off and on, then writes one enrollment
+    to show that only the queries reading Enrollments miss afterwards.
+
+    Returns:
+        (results without cache, results with cache)
+    """
+    conn, cursor = connect_db()
+    install(cursor)
+    conn.commit()
+
+    print("--- Cache off ---")
+    off = benchmark_suite(cursor, QUERIES, warmup, runs)
+    print("--- Cache on ---")
+    cache = ResultCache()
+    on = benchmark_suite(cursor, QUERIES, warmup, runs, cache=cache)
+
+    cursor.execute("""
+        UPDATE Enrollments SET grade = grade
+        WHERE enrollment_id = (SELECT MIN(enrollment_id) FROM Enrollments);
+    """)
+    conn.commit()
+    before = dict(cache.stats)
+    for qtext in QUERIES.values():
+        cache.fetch(cursor, qtext)
+    print(f"After a write to Enrollments: {cache.stats['invalidated'] - before['invalidated']} of "
+          f"{len(QUERIES)} queries invalidated")
+    cursor.close()
+    conn.close()
+
+    print(f"\n{'Query':<26} {'Off p50 ms':>11} {'On p50 ms':>10} {'Hit ratio':>10}")
+    for qname in QUERIES:
+        print(f"{qname:<26} {off[qname]['client_ms']['p50']:>11.3f} {on[qname]['client_ms']['p50']:>10.3f} "
+              f"{on[qname]['cache']['hit_ratio']:>10.2f}")
+    print(f"Overall hit ratio: {cache.hit_ratio():.2f} ({cache.stats})")
+
+    if scale is not None:
+        save_results(off, scale, "cache_off", warmup, runs)
+        save_results(on, scale, "cache_on", warmup, runs)
+    return off, on
+
+
+if __name__ == "__main__":
+    compare()
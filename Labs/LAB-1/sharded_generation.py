@@ -0,0 +1,108 @@
+"""
+Multi-process Sharded Data Generation for University Database
+-------------------------------------------------------------
+Splits a `scale` worth of Students (and their Enrollments) into fixed-size
+shards and generates them across a process pool.
+
+- Every shard has its own deterministic seed derived from (seed, shard index),
+  and shard boundaries depend only on `scale` and `shard_size`, so the output
+  for a given (scale, seed) is the same no matter how many workers run.
+- Emails are unique by construction (the student_id is part of the local part),
+  so no shared `fake.unique` set is needed across processes.
+- Finished shards are handed to the loader in shard order through a bounded
+  window of pending futures, so at most `queue_size` shards are held in memory.
+"""
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+
+from faker import Faker
+
+SEMESTERS = ["Fall 2023", "Spring 2024", "Fall 2024", "Spring 2025"]
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+
+def shard_seed(seed, index):
+    """Derives the deterministic seed of one shard."""
+    return seed * 1_000_003 + index
+
+
+def shard_bounds(scale, shard_size):
+    """Yields (index, offset, count) for every shard of `scale` students."""
+    for index, offset in enumerate(range(0, scale, shard_size)):
+        yield index, offset, min(shard_size, scale - offset)
+
+
+def unique_email(first, last, student_id, domain):
+    """Builds an email that is globally unique because it embeds the student_id."""
+    first, last = _NON_ALNUM.sub("", first.lower()), _NON_ALNUM.sub("", last.lower())
+    return f"{first}.{last}.{student_id}@{domain}"
+
+
+def generate_shard(index, seed, first_student_id, count, course_ids):
+    """
+    Generates one shard of Students and their Enrollments.
+
+    Args:
+        index: shard index (used for the shard seed)
+        seed: base seed of the dataset
+        first_student_id: client-side ID of the first student in this shard
+        count: number of students in this shard
+        course_ids: list of course_id values
+
+    Returns:
+        (students, enrollments): student rows with IDs, and enrollment rows
+        (student_id, course_id, semester, grade) without enrollment_id
+    """
+    fake = Faker()
+    fake.seed_instance(shard_seed(seed, index))
+    rng = Random(shard_seed(seed, index))
+
+    students, enrollments = [], []
+    for student_id in range(first_student_id, first_student_id + count):
+        first, last = fake.first_name(), fake.last_name()
+        students.append((
+            student_id, first, last,
+            unique_email(first, last, student_id, fake.free_email_domain()),
+            fake.date_between(start_date="-4y", end_date="today"),
+            fake.date_of_birth(minimum_age=18, maximum_age=30)
+        ))
+        for c in rng.sample(course_ids, rng.randint(5, 10)):
+            enrollments.append((student_id, c, rng.choice(SEMESTERS), rng.randint(50, 100)))
+    return students, enrollments
+
+
+def generate_shards(scale, course_ids, first_student_id=1, seed=0, workers=None,
+                    shard_size=10000, queue_size=None):
+    """
+    Generates the dataset across a process pool and yields shards in order.
+
+    Args:
+        scale: number of students
+        course_ids: list of course_id values
+        first_student_id: client-side ID of the first student
+        seed: base seed; the same (scale, seed) always yields the same rows
+        workers: number of processes (defaults to os.cpu_count())
+        shard_size: students per shard
+        queue_size: max shards generated ahead of the loader (defaults to 2 * workers)
+
+    Yields:
+        (students, enrollments) for each shard, in shard order
+    """
+    workers = workers or os.cpu_count() or 1
+    queue_size = queue_size or 2 * workers
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, offset, count in shard_bounds(scale, shard_size):
+            if len(pending) >= queue_size:
+                yield pending.popleft().result()
+            pending.append(pool.submit(
+                generate_shard, index, seed, first_student_id + offset, count, course_ids
+            ))
+        while pending:
+            yield pending.popleft().result()
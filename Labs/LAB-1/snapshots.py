@@ -0,0 +1,252 @@
+"""
+Dataset Snapshots for University Database
+-----------------------------------------
+Every experiment used to refresh() the tables and regenerate + reinsert the
+whole dataset. Once a dataset has been loaded for a given (scale, seed), this
+module keeps it as a template database and restores it in seconds with
+`CREATE DATABASE university_db TEMPLATE <snapshot>`.
+
+- ensure_dataset(scale, seed): restore the snapshot if there is one,
+  otherwise load the dataset with the bulk loader and save it.
+- save_snapshot / restore_snapshot / list_snapshots / evict_snapshot work
+  on template databases named university_snap_<scale>_<seed>_<variant>.
+  The variant is a short hash of the load options and of the table layout
+  (Enrollments partitioning, constraints), so a dataset loaded differently
+  never restores in place of another.
+- dump_snapshot / load_dump do the same through a file-level pg_dump
+  (directory format, parallel jobs), for servers where a template copy is
+  not possible or snapshots must outlive the cluster.
+
+Both template copies and restores need every other session on the source
+database closed; those sessions are terminated first.
+
+Usage:
+    python snapshots.py list
+    python snapshots.py save --scale 100000 [--seed 100000] [--variant <hash>]
+    python snapshots.py restore --scale 100000
+    python snapshots.py evict --scale 100000
+    python snapshots.py evict --all
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+import psycopg2
+
+from table_creation import TABLES, connect_db
+
+DB_NAME = "university_db"
+SNAPSHOT_PREFIX = "university_snap_"
+DUMP_DIR = Path(__file__).parent / "snapshots"
+
+
+def connect_admin():
+    """Autocommit connection to the maintenance database (CREATE/DROP DATABASE cannot run in a transaction)."""
+    conn = psycopg2.connect(
+        host="localhost",
+        database="postgres",
+        user="postgres",
+        password="12345")
+    conn.autocommit = True
+    return conn, conn.cursor()
+
+
+def table_layout():
+    """Enrollments partitioning and the constraints of the five tables in university_db."""
+    conn, cursor = connect_db()
+    cursor.execute("""
+        SELECT pg_get_partkeydef('enrollments'::regclass),
+               (SELECT COUNT(*) FROM pg_partition_tree('enrollments')),
+               (SELECT array_agg(conrelid::regclass::text || ' ' || pg_get_constraintdef(oid)
+                                 ORDER BY conrelid::regclass::text, pg_get_constraintdef(oid))
+                FROM pg_constraint
+                WHERE conrelid::regclass::text = ANY(%s));
+    """, ([t.lower() for t in TABLES],))
+    partition_key, partitions, constraints = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return {"partition_key": partition_key, "partitions": partitions, "constraints": constraints or []}
+
+
+def dataset_variant(load_options=None, layout=None):
+    """Short hash of the load options and the table layout (read from university_db if not given)."""
+    spec = {"load_options": load_options or {}, "layout": layout if layout is not None else table_layout()}
+    return hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:8]
+
+
+def snapshot_name(scale, seed, variant=None):
+    variant = variant or dataset_variant()
+    return f"{SNAPSHOT_PREFIX}{scale}_{seed}_{variant}"
+
+
+def _terminate_sessions(cursor, database):
+    cursor.execute("""
+        SELECT pg_terminate_backend(pid)
+        FROM pg_stat_activity
+        WHERE datname = %s AND pid <> pg_backend_pid();
+    """, (database,))
+
+
+def _exists(cursor, database):
+    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (database,))
+    return cursor.fetchone() is not None
+
+
+def save_snapshot(scale, seed, variant=None, load_options=None):
+    """Copies university_db into the template database of (scale, seed, variant), replacing an older one."""
+    layout = table_layout()
+    variant = variant or dataset_variant(load_options, layout)
+    name = snapshot_name(scale, seed, variant)
+    conn, cursor = connect_admin()
+    start = time.perf_counter()
+    _terminate_sessions(cursor, DB_NAME)
+    cursor.execute(f"DROP DATABASE IF EXISTS {name};")
+    cursor.execute(f"CREATE DATABASE {name} TEMPLATE {DB_NAME};")
+    meta = json.dumps({"scale": scale, "seed": seed, "variant": variant, "load_options": load_options or {},
+                       "partition_key": layout["partition_key"],
+                       "created": datetime.now().isoformat(timespec="seconds")}, default=str)
+    cursor.execute(f"COMMENT ON DATABASE {name} IS %s;", (meta,))
+    cursor.close()
+    conn.close()
+    print(f"📸 Snapshot '{name}' saved in {time.perf_counter() - start:.2f}s")
+    return name
+
+
+def restore_snapshot(scale, seed, variant=None):
+    """
+    Replaces university_db with a copy of the (scale, seed, variant) snapshot
+    (variant defaults to the current table layout with default load options).
+
+    Returns:
+        True if the snapshot existed and was restored, False otherwise
+    """
+    name = snapshot_name(scale, seed, variant)
+    conn, cursor = connect_admin()
+    try:
+        if not _exists(cursor, name):
+            return False
+        start = time.perf_counter()
+        # copy under a staging name first: if the template is busy or broken,
+        # university_db is left untouched
+        staging = f"{DB_NAME}_restoring"
+        _terminate_sessions(cursor, name)
+        cursor.execute(f"DROP DATABASE IF EXISTS {staging};")
+        cursor.execute(f"CREATE DATABASE {staging} TEMPLATE {name};")
+        cursor.execute(f"DROP DATABASE IF EXISTS {DB_NAME} WITH (FORCE);")
+        cursor.execute(f"ALTER DATABASE {staging} RENAME TO {DB_NAME};")
+        print(f"♻️ Restored '{name}' in {time.perf_counter() - start:.2f}s")
+        return True
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def list_snapshots():
+    """Returns (name, size_bytes, metadata) for every snapshot and prints them."""
+    conn, cursor = connect_admin()
+    cursor.execute("""
+        SELECT datname, pg_database_size(datname), shobj_description(oid, 'pg_database')
+        FROM pg_database
+        WHERE datname LIKE %s
+        ORDER BY datname;
+    """, (SNAPSHOT_PREFIX + "%",))
+    snapshots = [(name, size, json.loads(meta) if meta else {}) for name, size, meta in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+
+    for name, size, meta in snapshots:
+        print(f"{name:<40} {size / 1024 ** 2:>10.1f} MB   created {meta.get('created', '?')}")
+    if not snapshots:
+        print("No snapshots.")
+    return snapshots
+
+
+def evict_snapshot(scale=None, seed=None, all_snapshots=False, variant=None):
+    """Drops one snapshot, or every snapshot with all_snapshots=True."""
+    names = [s[0] for s in list_snapshots()] if all_snapshots else [snapshot_name(scale, seed, variant)]
+    conn, cursor = connect_admin()
+    for name in names:
+        _terminate_sessions(cursor, name)
+        cursor.execute(f"DROP DATABASE IF EXISTS {name};")
+        print(f"🗑️ Evicted '{name}'")
+    cursor.close()
+    conn.close()
+
+
+def ensure_dataset(scale, seed, **load_options):
+    """
+    Makes university_db hold the (scale, seed) dataset as fast as possible.
+
+    Restores the snapshot if it exists; otherwise empties the tables, bulk
+    loads the dataset (load_options are passed to bulk_loader.main) and saves
+    a snapshot for next time. The snapshot is matched on the load options and
+    the current table layout as well as (scale, seed).
+    """
+    variant = dataset_variant(load_options)
+    if restore_snapshot(scale, seed, variant):
+        return
+    from bulk_loader import main as bulk_load
+    from refresh import refresh
+
+    refresh()
+    bulk_load(scale=scale, seed=seed, **load_options)
+    save_snapshot(scale, seed, variant, load_options)
+
+
+def _pg_env():
+    return dict(os.environ, PGPASSWORD="12345")
+
+
+def dump_snapshot(scale, seed, jobs=4, variant=None):
+    """File-level snapshot: pg_dump of university_db in directory format with parallel jobs."""
+    path = DUMP_DIR / snapshot_name(scale, seed, variant)
+    start = time.perf_counter()
+    subprocess.run(
+        ["pg_dump", "-h", "localhost", "-U", "postgres", "-Fd", "-j", str(jobs), "-f", str(path), DB_NAME],
+        check=True, env=_pg_env()
+    )
+    print(f"💾 Dumped to '{path}' in {time.perf_counter() - start:.2f}s")
+    return path
+
+
+def load_dump(scale, seed, jobs=4, variant=None):
+    """Restores university_db from a file-level snapshot made by dump_snapshot."""
+    path = DUMP_DIR / snapshot_name(scale, seed, variant)
+    start = time.perf_counter()
+    subprocess.run(
+        ["pg_restore", "-h", "localhost", "-U", "postgres", "--clean", "--if-exists",
+         "-j", str(jobs), "-d", DB_NAME, str(path)],
+        check=True, env=_pg_env()
+    )
+    print(f"♻️ Restored '{path}' in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage university_db dataset snapshots")
+    parser.add_argument("command", choices=["list", "save", "restore", "evict", "dump", "load-dump"])
+    parser.add_argument("--scale", type=int)
+    parser.add_argument("--seed", type=int, help="defaults to the scale")
+    parser.add_argument("--all", action="store_true", help="evict every snapshot")
+    parser.add_argument("--variant", help="load options / layout hash (defaults to the current layout)")
+    args = parser.parse_args()
+    seed = args.seed if args.seed is not None else args.scale
+
+    if args.command == "list":
+        list_snapshots()
+    elif args.command == "evict":
+        evict_snapshot(args.scale, seed, all_snapshots=args.all, variant=args.variant)
+    elif args.command == "save":
+        save_snapshot(args.scale, seed, args.variant)
+    elif args.command == "restore":
+        if not restore_snapshot(args.scale, seed, args.variant):
+            print(f"No snapshot '{snapshot_name(args.scale, seed, args.variant)}'")
+    elif args.command == "dump":
+        dump_snapshot(args.scale, seed, variant=args.variant)
+    else:
+        load_dump(args.scale, seed, variant=args.variant)
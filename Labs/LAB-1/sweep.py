@@ -0,0 +1,329 @@
+"""
+Resumable Scale Sweep for the LAB-1 Experiment
+----------------------------------------------
+Runs the whole experiment for every scale, one stage at a time:
+
+    reset -> generate -> load -> constraints -> maintenance
+          -> indexes_<variant> -> benchmark_<variant>   (for every index variant)
+
+- reset: recreate the tables bare (deferred_load.recreate_tables)
+- generate: run the vectorized generator alone, without a database, to
+  isolate the cost of producing the data from the cost of loading it
+- load: bulk load (bulk_loader.main), generation streamed into COPY
+- constraints: rebuild primary keys, UNIQUE emails and foreign keys
+  concurrently (deferred_load.build_phases without secondary indexes)
+- maintenance: statistics targets, VACUUM (ANALYZE), table / index sizes and
+  row-estimate accuracy (maintenance.run)
+- indexes_<variant>: drop every secondary index, build the variant's ones
+  concurrently and ANALYZE; variants are no_index, with_index
+  (indexing.INDEXES) and advised (index_advisor's kept indexes, if any)
+- benchmark_<variant>: benchmark_suite over QUERIES, plans included
+
+Every stage records wall time, CPU time and peak RSS of this process, and
+the store (results/sweep.json) is checkpointed after each one. Running the
+sweep again skips finished stages, so a failure at 1M students does not
+throw away the earlier scales; if the database no longer holds the scale
+being resumed, that scale restarts from reset. The scaling charts are drawn
+from the store alone (plot()).
+
+Usage:
+    python sweep.py                      # run / resume the sweep, then plot
+    python sweep.py --scales 1000 10000  # subset of scales
+    python sweep.py --fresh              # discard the store and start over
+    python sweep.py --plot-only
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+from benchmark import RESULTS_DIR, benchmark_suite, measure
+from bulk_loader import main as bulk_load
+from data_insertion import connect_db
+from deferred_load import build_phases, recreate_tables, run_phases, run_statements
+from index_advisor import ADVICE_PATH, load_advised_indexes
+from indexing import INDEXES
+from maintenance import run as run_maintenance
+from queries import QUERIES
+from table_creation import TABLES
+from vectorized_generation import generate_batches
+
+STORE_PATH = RESULTS_DIR / "sweep.json"
+SCALES = [1000, 10000, 100000, 1000000]
+# Stages after which the database holds the dataset of the scale being swept
+_LOADED_STAGES = ("load",)
+
+
+def index_variants():
+    variants = {"no_index": [], "with_index": list(INDEXES)}
+    if ADVICE_PATH.exists():
+        variants["advised"] = load_advised_indexes()
+    return variants
+
+
+def stage_names(variants):
+    names = ["reset", "generate", "load", "constraints", "maintenance"]
+    for variant in variants:
+        names += [f"indexes_{variant}", f"benchmark_{variant}"]
+    return names
+
+
+# ---------- Results store ----------
+
+def new_store():
+    return {"created": datetime.now().isoformat(timespec="seconds"), "loaded_scale": None, "scales": {}}
+
+
+def load_store(path=STORE_PATH):
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return new_store()
+
+
+def save_store(store, path=STORE_PATH):
+    """Checkpoints the store atomically, so a crash mid-write cannot corrupt it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(store, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+# ---------- Stages ----------
+
+def _autocommit(*statements):
+    conn, cursor = connect_db()
+    conn.autocommit = True
+    for sql in statements:
+        cursor.execute(sql)
+    cursor.close()
+    conn.close()
+
+
+def stage_reset(scale, seed, variants):
+    recreate_tables(constraints=False)
+    return {}
+
+
+def stage_generate(scale, seed, variants):
+    # data_insertion always creates 200 courses, numbered from 1 after a reset
+    students = enrollments = 0
+    for s, e in generate_batches(scale, list(range(1, 201)), 1, seed):
+        students += len(s["student_id"])
+        enrollments += len(e["student_id"])
+    return {"students": students, "enrollments": enrollments}
+
+
+def stage_load(scale, seed, variants):
+    return {"tables": bulk_load(scale=scale, seed=seed, maintain=False)}
+
+
+def stage_constraints(scale, seed, variants):
+    return {"phases": run_phases(build_phases(indexes=()))}
+
+
+def stage_maintenance(scale, seed, variants):
+    report = run_maintenance(scale)
+    return {key: report[key] for key in ("seconds", "tables", "indexes", "estimates")}
+
+
+def drop_secondary_indexes(cursor):
+    """Drops every index on the five tables that does not back a constraint; returns their names."""
+    cursor.execute("""
+        SELECT i.indexrelid::regclass::text
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = ANY(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid);
+    """, ([t.lower() for t in TABLES],))
+    names = [row[0] for row in cursor.fetchall()]
+    for name in names:
+        cursor.execute(f"DROP INDEX IF EXISTS {name};")
+    return names
+
+
+def stage_indexes(variant):
+    def run(scale, seed, variants):
+        conn, cursor = connect_db()
+        conn.autocommit = True
+        dropped = drop_secondary_indexes(cursor)
+        ddl = variants[variant]
+        if any("gin_trgm_ops" in sql for sql in ddl):
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        cursor.close()
+        conn.close()
+        timings = run_statements(ddl)
+        _autocommit("ANALYZE;")
+        return {"dropped": dropped, "statements": timings}
+    return run
+
+
+def stage_benchmark(variant, warmup, runs):
+    def run(scale, seed, variants):
+        conn, cursor = connect_db()
+        results = benchmark_suite(cursor, QUERIES, warmup, runs)
+        cursor.close()
+        conn.close()
+        return {"warmup": warmup, "runs": runs, "queries": results}
+    return run
+
+
+def _stage_functions(variants, warmup, runs):
+    functions = {
+        "reset": stage_reset,
+        "generate": stage_generate,
+        "load": stage_load,
+        "constraints": stage_constraints,
+        "maintenance": stage_maintenance,
+    }
+    for variant in variants:
+        functions[f"indexes_{variant}"] = stage_indexes(variant)
+        functions[f"benchmark_{variant}"] = stage_benchmark(variant, warmup, runs)
+    return functions
+
+
+# ---------- Orchestration ----------
+
+def run(scales=SCALES, warmup=2, runs=10, fresh=False, path=STORE_PATH):
+    """
+    Runs (or resumes) the sweep, checkpointing the store after every stage.
+
+    Returns:
+        the results store
+    """
+    store = new_store() if fresh else load_store(path)
+    variants = index_variants()
+    names = stage_names(variants)
+    functions = _stage_functions(variants, warmup, runs)
+
+    for scale in scales:
+        entry = store["scales"].setdefault(str(scale), {"seed": scale, "stages": {}})
+        stages = entry["stages"]
+        pending = [n for n in names if not stages.get(n, {}).get("done")]
+        if not pending:
+            print(f"\n=== {scale} students: already complete ===")
+            continue
+        # Resuming past the load needs this scale's data still in the database
+        if names.index(pending[0]) > names.index("load") and store["loaded_scale"] != scale:
+            print(f"Database no longer holds {scale} students; restarting the scale from reset")
+            stages.clear()
+            pending = names
+
+        print(f"\n=== {scale} students: {', '.join(pending)} ===")
+        for name in pending:
+            record = {"started": datetime.now().isoformat(timespec="seconds")}
+            stages[name] = record
+            if name == "reset":
+                store["loaded_scale"] = None
+            try:
+                with measure(record):
+                    record.update(functions[name](scale, entry["seed"], variants) or {})
+            except BaseException as e:
+                record["error"] = f"{e.__class__.__name__}: {e}"
+                save_store(store, path)
+                print(f"❌ {name} failed at {scale} students; rerun to resume from here")
+                raise
+            record["done"] = True
+            if name in _LOADED_STAGES:
+                store["loaded_scale"] = scale
+            save_store(store, path)
+            print(f"⏱️ {name}: wall {record['wall_s']:.2f}s | cpu {record['cpu_s']:.2f}s | "
+                  f"peak RSS {record['peak_rss_mb']:.1f} MB")
+    return store
+
+
+# ---------- Charts ----------
+
+def plot(store=None, output_dir=RESULTS_DIR):
+    """Draws the scaling charts from the store; returns the written file paths."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    store = store or load_store()
+    scales = sorted(int(s) for s in store["scales"])
+    paths = []
+
+    # Query p50 vs scale, one panel per index variant
+    variants = sorted({
+        name[len("benchmark_"):] for s in scales for name, stage in store["scales"][str(s)]["stages"].items()
+        if name.startswith("benchmark_") and stage.get("done")
+    })
+    if variants:
+        fig, axes = plt.subplots(1, len(variants), figsize=(6 * len(variants), 5), sharey=True, squeeze=False)
+        for ax, variant in zip(axes[0], variants):
+            series = {}
+            for s in scales:
+                stage = store["scales"][str(s)]["stages"].get(f"benchmark_{variant}", {})
+                for qname, result in stage.get("queries", {}).items():
+                    series.setdefault(qname, []).append((s, result["client_ms"]["p50"]))
+            for qname, points in series.items():
+                ax.plot(*zip(*points), marker="o", label=qname)
+            ax.set_xscale("log")
+            ax.set_yscale("log")
+            ax.set_title(variant)
+            ax.set_xlabel("Students")
+        axes[0][0].set_ylabel("p50 latency (ms)")
+        axes[0][-1].legend(fontsize=8)
+        fig.suptitle("Query latency vs data scale")
+        fig.tight_layout()
+        paths.append(output_dir / "sweep_query_scaling.png")
+        fig.savefig(paths[-1])
+        plt.close(fig)
+
+    # Wall time, CPU time and peak RSS per stage vs scale
+    stage_order = []
+    for s in scales:
+        for name in store["scales"][str(s)]["stages"]:
+            if name not in stage_order:
+                stage_order.append(name)
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    for ax, metric, label in zip(axes, ("wall_s", "cpu_s", "peak_rss_mb"),
+                                 ("Wall time (s)", "CPU time (s)", "Peak RSS (MB)")):
+        for name in stage_order:
+            points = [(s, store["scales"][str(s)]["stages"][name][metric]) for s in scales
+                      if store["scales"][str(s)]["stages"].get(name, {}).get("done")]
+            if points:
+                ax.plot(*zip(*points), marker="o", label=name)
+        ax.set_xscale("log")
+        if metric != "peak_rss_mb":
+            ax.set_yscale("log")
+        ax.set_xlabel("Students")
+        ax.set_ylabel(label)
+    axes[-1].legend(fontsize=8)
+    fig.suptitle("Cost of each stage vs data scale")
+    fig.tight_layout()
+    paths.append(output_dir / "sweep_stage_scaling.png")
+    fig.savefig(paths[-1])
+    plt.close(fig)
+
+    for p in paths:
+        print(f"📊 Chart saved to '{p}'")
+    return paths
+
+
+def print_summary(store):
+    print(f"\n{'Scale':>8} {'Stage':<22} {'Wall s':>9} {'CPU s':>9} {'RSS MB':>8}")
+    for s in sorted(store["scales"], key=int):
+        for name, stage in store["scales"][s]["stages"].items():
+            if stage.get("done"):
+                print(f"{s:>8} {name:<22} {stage['wall_s']:>9.2f} {stage['cpu_s']:>9.2f} {stage['peak_rss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run or resume the LAB-1 scale sweep")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--fresh", action="store_true", help="discard the existing store")
+    parser.add_argument("--plot-only", action="store_true")
+    args = parser.parse_args()
+
+    if args.plot_only:
+        store = load_store()
+    else:
+        store = run(args.scales, args.warmup, args.runs, fresh=args.fresh)
+    print_summary(store)
+    plot(store)
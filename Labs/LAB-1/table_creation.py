@@ -1,68 +1,210 @@
 import psycopg2
 
-conn = psycopg2.connect(
-    host="localhost",
-    database="university_db",
-    user="postgres",
-    password="12345"
-)
-cursor = conn.cursor()
-
-# Departments
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS Departments (
-    department_id SERIAL PRIMARY KEY,
-    department_name VARCHAR(100),
-    building VARCHAR(50)
-);
-''')
-
-# Teachers
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS Teachers (
-    teacher_id SERIAL PRIMARY KEY,
-    first_name VARCHAR(50),
-    last_name VARCHAR(50),
-    email VARCHAR(100) UNIQUE,
-    department_id INT REFERENCES Departments(department_id),
-    hire_date DATE
-);
-""")
-
-# Courses
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS Courses (
-    course_id SERIAL PRIMARY KEY,
-    course_name VARCHAR(100),
-    credits INT,
-    teacher_id INT REFERENCES Teachers(teacher_id)
-);
-""")
-
-# Students
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS Students (
-    student_id SERIAL PRIMARY KEY,
-    first_name VARCHAR(50),
-    last_name VARCHAR(50),
-    email VARCHAR(100) UNIQUE,
-    enrollment_date DATE,
-    date_of_birth DATE
-);
-""")
-
-# Enrollments
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS Enrollments (
-    enrollment_id SERIAL PRIMARY KEY,
-    student_id INT REFERENCES Students(student_id),
-    course_id INT REFERENCES Courses(course_id),
+SEMESTERS = ["Fall 2023", "Spring 2024", "Fall 2024", "Spring 2025"]
+
+# foreign keys are added from FOREIGN_KEYS (add_enrollment_foreign_keys), so Enrollments
+# can be created while Students / Courses are bare (deferred load, sweep reset)
+ENROLLMENT_COLUMNS = """
+    enrollment_id SERIAL,
+    student_id INT,
+    course_id INT,
     semester VARCHAR(20),
     grade INT
-);
-""")
+"""
+
+
+TABLES = ["Departments", "Teachers", "Courses", "Students", "Enrollments"]
+
+UNIQUE_CONSTRAINTS = [("Teachers", "teachers_email_key", "email"), ("Students", "students_email_key", "email")]
+
+FOREIGN_KEYS = [
+    ("Teachers", "teachers_department_id_fkey", "department_id", "Departments(department_id)"),
+    ("Courses", "courses_teacher_id_fkey", "teacher_id", "Teachers(teacher_id)"),
+    ("Enrollments", "enrollments_student_id_fkey", "student_id", "Students(student_id)"),
+    ("Enrollments", "enrollments_course_id_fkey", "course_id", "Courses(course_id)"),
+]
+
+
+def enrollment_key(partitioning=None):
+    """Primary key columns of Enrollments: every partition key column (at every level) must be part of it."""
+    if partitioning == "semester_hash":
+        return "enrollment_id, semester, student_id"
+    if partitioning == "semester":
+        return "enrollment_id, semester"
+    return "enrollment_id"
+
+
+def primary_keys(partitioning=None):
+    """(table, constraint name, columns) of every primary key."""
+    return [
+        ("Departments", "departments_pkey", "department_id"),
+        ("Teachers", "teachers_pkey", "teacher_id"),
+        ("Courses", "courses_pkey", "course_id"),
+        ("Students", "students_pkey", "student_id"),
+        ("Enrollments", "enrollments_pkey", enrollment_key(partitioning)),
+    ]
+
+
+def connect_db():
+    conn = psycopg2.connect(
+        host="localhost",
+        database="university_db",
+        user="postgres",
+        password="12345"
+    )
+    return conn, conn.cursor()
+
+
+def add_enrollment_foreign_keys(cursor):
+    """
+    Adds the foreign keys of Enrollments from FOREIGN_KEYS, skipping those
+    that exist already or whose target has no primary key yet (bare tables:
+    deferred_load.py adds them after the load).
+    """
+    for table, name, column, target in FOREIGN_KEYS:
+        if table != "Enrollments":
+            continue
+        cursor.execute("""
+            SELECT
+                EXISTS (SELECT 1 FROM pg_constraint WHERE conname = %s AND conrelid = 'enrollments'::regclass),
+                EXISTS (SELECT 1 FROM pg_constraint WHERE contype = 'p' AND conrelid = %s::regclass);
+        """, (name, target.split("(")[0].lower()))
+        exists, target_has_key = cursor.fetchone()
+        if not exists and target_has_key:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target};")
+
+
+def create_enrollments(cursor, partitioning=None, hash_partitions=4):
+    """
+    Creates the Enrollments table.
+
+    Args:
+        cursor: psycopg2 cursor object
+        partitioning: None for a plain table, "semester" for LIST partitions
+            per semester, or "semester_hash" for LIST partitions per semester,
+            each split into `hash_partitions` HASH partitions on student_id
+        hash_partitions: number of hash partitions per semester
+    """
+    if partitioning is None:
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS Enrollments (
+            {ENROLLMENT_COLUMNS.strip()},
+            PRIMARY KEY (enrollment_id)
+        );
+        """)
+        add_enrollment_foreign_keys(cursor)
+        return
+
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS Enrollments (
+        {ENROLLMENT_COLUMNS.strip()},
+        PRIMARY KEY ({enrollment_key(partitioning)})
+    ) PARTITION BY LIST (semester);
+    """)
+    for semester in SEMESTERS:
+        name = "enrollments_" + semester.lower().replace(" ", "_")
+        sub = " PARTITION BY HASH (student_id)" if partitioning == "semester_hash" else ""
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF Enrollments FOR VALUES IN ('{semester}'){sub};"
+        )
+        if partitioning == "semester_hash":
+            for r in range(hash_partitions):
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name}_h{r} PARTITION OF {name} "
+                    f"FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {r});"
+                )
+    cursor.execute("CREATE TABLE IF NOT EXISTS enrollments_default PARTITION OF Enrollments DEFAULT;")
+    add_enrollment_foreign_keys(cursor)
+
+
+def drop_constraints(cursor):
+    """
+    Strips every table down to its columns: drops the primary keys, unique
+    constraints and foreign keys (and with them their indexes), so a bulk
+    load pays for none of them. They are rebuilt by deferred_load.py.
+    """
+    for table, name, *_ in FOREIGN_KEYS + UNIQUE_CONSTRAINTS + primary_keys()[::-1]:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name};")
+
+
+def create_tables(partitioning=None, hash_partitions=4, constraints=True):
+    """
+    Creates every table of the University Database (if not already existing).
+
+    Args:
+        partitioning: layout of Enrollments, see create_enrollments()
+        hash_partitions: number of hash partitions per semester
+        constraints: False leaves the tables bare (no primary keys, unique
+            constraints or foreign keys), see drop_constraints()
+    """
+    conn, cursor = connect_db()
+
+    # Departments
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Departments (
+        department_id SERIAL PRIMARY KEY,
+        department_name VARCHAR(100),
+        building VARCHAR(50)
+    );
+    ''')
+
+    # Teachers
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Teachers (
+        teacher_id SERIAL PRIMARY KEY,
+        first_name VARCHAR(50),
+        last_name VARCHAR(50),
+        email VARCHAR(100) UNIQUE,
+        department_id INT REFERENCES Departments(department_id),
+        hire_date DATE
+    );
+    """)
+
+    # Courses
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Courses (
+        course_id SERIAL PRIMARY KEY,
+        course_name VARCHAR(100),
+        credits INT,
+        teacher_id INT REFERENCES Teachers(teacher_id)
+    );
+    """)
+
+    # Students
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Students (
+        student_id SERIAL PRIMARY KEY,
+        first_name VARCHAR(50),
+        last_name VARCHAR(50),
+        email VARCHAR(100) UNIQUE,
+        enrollment_date DATE,
+        date_of_birth DATE
+    );
+    """)
+
+    # Enrollments
+    create_enrollments(cursor, partitioning, hash_partitions)
+
+    if not constraints:
+        drop_constraints(cursor)
+
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print("All tables created successfully (if not already existing)!")
+
+
+def recreate_enrollments(partitioning=None, hash_partitions=4):
+    """Drops Enrollments (and its data) and creates it again with the given layout."""
+    conn, cursor = connect_db()
+    cursor.execute("DROP TABLE IF EXISTS Enrollments CASCADE;")
+    create_enrollments(cursor, partitioning, hash_partitions)
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"Enrollments recreated (partitioning: {partitioning or 'none'})")
+
 
-conn.commit()
-cursor.close()
-conn.close()
-print("All tables created successfully (if not already existing)!")
+if __name__ == "__main__":
+    # None, "semester" or "semester_hash" (see create_enrollments)
+    create_tables(partitioning=None)
@@ -0,0 +1,36 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from index_advisor import normalize, propose, split_conditions  # noqa: E402
+
+
+def seq_scan_plan(filter_text):
+    scan = {"Node Type": "Seq Scan", "Relation Name": "students", "Alias": "s",
+            "Total Cost": 100.0, "Filter": filter_text, "Output": ["s.student_id", "s.email"]}
+    return {"Node Type": "Result", "Total Cost": 100.0, "Plans": [scan]}
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_function_call_parentheses_are_kept(self):
+        self.assertEqual(normalize("(lower((s.email)::text) = 'x'::text)", "s"), "lower(email) = 'x'")
+
+    def test_redundant_parentheses_are_dropped(self):
+        self.assertEqual(normalize("((s.email)::text ~~ '%x%'::text)", "s"), "email ~~ '%x%'")
+
+    def test_and_conjuncts_are_unwrapped(self):
+        conditions = split_conditions("((s.enrollment_year > 2020) AND ((s.a = 1) OR (s.b = 2)))")
+        self.assertEqual([normalize(c, "s") for c in conditions], ["enrollment_year > 2020", "(a = 1) OR (b = 2)"])
+
+
+class ProposeTest(unittest.TestCase):
+    def test_lower_predicate_yields_expression_index(self):
+        candidates = propose("Q", seq_scan_plan("(lower((s.email)::text) = 'x'::text)"))
+        ddl = [c["ddl"] for c in candidates if c["kind"] == "expr"]
+        self.assertEqual(ddl, ["CREATE INDEX IF NOT EXISTS idx_adv_students_expr_email ON students ((lower(email)));"])
+
+
+if __name__ == "__main__":
+    unittest.main()
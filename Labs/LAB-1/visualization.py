@@ -71,13 +71,25 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
+from benchmark import load_results
 
-# Data
-queries = ['Q1_Simple_Filter', 'Q2_Simple_Join_Filter', 'Q3_MultiJoin_TextSearch',
-           'Q4_Join_Aggregation', 'Q5_Complex_Top10']
+# Data: p50 client latency per query, read from the JSON files written by
+# queries.run_benchmarks (without indexes) and rerun_with_index.py (with indexes)
+SCALE = 1000000
 
-with_indexes = [424.7, 671.16, 2.51, 1.17, 2312.97]
-without_indexes = [1000000.7, 756.1, 4634.75, 24.15, 3957.74]
+
+def p50_by_query(label, scale):
+    for document in load_results(label=label):
+        if document["scale"] == scale:
+            return {q: r["client_ms"]["p50"] for q, r in document["queries"].items()}
+    raise FileNotFoundError(f"No '{label}' benchmark results for scale {scale}; run the benchmarks first.")
+
+
+without = p50_by_query("no_index", SCALE)
+with_idx = p50_by_query("with_index", SCALE)
+queries = list(without.keys())
+with_indexes = [with_idx[q] for q in queries]
+without_indexes = [without[q] for q in queries]
 
 # Create the visualization
 plt.figure(figsize=(12, 8))
@@ -88,8 +100,8 @@ plt.bar(x_pos - bar_width / 2, without_indexes, bar_width, label='Without Indexe
 plt.bar(x_pos + bar_width / 2, with_indexes, bar_width, label='With Indexes', alpha=0.8, color='green')
 
 plt.xlabel('Queries')
-plt.ylabel('Execution Time (ms) - Log Scale')
-plt.title('Impact of Indexing on Query Performance (1 Million Records)')
+plt.ylabel('p50 Execution Time (ms) - Log Scale')
+plt.title(f'Impact of Indexing on Query Performance ({SCALE:,} Records)')
 plt.yscale('log')  # Using log scale due to huge differences
 plt.xticks(x_pos, queries, rotation=45, ha='right')
 plt.legend()
@@ -109,4 +121,4 @@ improvement = [(without_indexes[i] - with_indexes[i]) / without_indexes[i] * 100
 
 print("Performance Improvement by Query:")
 for i, query in enumerate(queries):
-    print(f"{query}: {improvement[i]:.2f}% improvement")
\ No newline at end of file
+    print(f"{query}: {improvement[i]:.2f}% improvement")
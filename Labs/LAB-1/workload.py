@@ -0,0 +1,212 @@
+"""
+Parameterized Randomized Workload for University Database Queries
+-----------------------------------------------------------------
+QUERIES hardcodes its literals (year 2023, teacher_id = 50, 'Advanced',
+'Spring 2025'), so every timed run reads the same pages and the measured
+latency is a best case. Here each query is a template whose parameter is
+drawn from the values actually present in the loaded data:
+
+- "data": each value as often as it occurs in the data
+- "uniform": every distinct value is equally likely
+- "zipf": values ranked by how often they occur in the data, the k-th most
+  frequent drawn with probability proportional to 1 / k^s (hot keys dominate)
+
+Templates run as server-side prepared statements (PREPARE / EXECUTE) under
+each plan_cache_mode:
+- force_custom_plan: planned for every parameter value
+- force_generic_plan: planned once, for any value
+- auto: PostgreSQL's choice (generic after five executions if not costlier)
+
+For every template and mode the report gives the latency summary over all
+draws, the spread across parameter values (per-value p50, slowest / fastest)
+and, for a few values, EXPLAIN ANALYZE EXECUTE planning time, execution time
+and estimated cost, so generic and custom plans can be compared per scale.
+
+Q4 has no literal to parameterize and is left out.
+"""
+
+import json
+import statistics
+import time
+
+import numpy as np
+
+from benchmark import RESULTS_DIR, summarize
+from data_insertion import connect_db
+
+TEMPLATES = {
+    "Q1_Simple_Filter": {
+        "sql": "SELECT * FROM Students WHERE EXTRACT(YEAR FROM enrollment_date) = $1",
+        "type": "numeric",
+        "domain": "SELECT EXTRACT(YEAR FROM enrollment_date), COUNT(*) FROM Students GROUP BY 1",
+    },
+    "Q2_Simple_Join_Filter": {
+        "sql": """
+            SELECT DISTINCT s.email
+            FROM Students s
+            JOIN Enrollments e ON s.student_id = e.student_id
+            JOIN Courses c ON e.course_id = c.course_id
+            WHERE c.teacher_id = $1
+        """,
+        "type": "int",
+        "domain": "SELECT teacher_id, COUNT(*) FROM Courses GROUP BY 1",
+    },
+    "Q3_MultiJoin_TextSearch": {
+        "sql": """
+            SELECT DISTINCT t.first_name || ' ' || t.last_name AS teacher_name
+            FROM Teachers t
+            JOIN Courses c ON t.teacher_id = c.teacher_id
+            WHERE c.course_name ILIKE '%' || $1 || '%'
+        """,
+        "type": "text",
+        "domain": "SELECT w, COUNT(*) FROM Courses, regexp_split_to_table(course_name, '\\s+') w GROUP BY 1",
+    },
+    "Q5_Complex_Top10": {
+        "sql": """
+            SELECT s.first_name || ' ' || s.last_name AS student_name,
+                   AVG(e.grade) AS avg_grade
+            FROM Students s
+            JOIN Enrollments e ON s.student_id = e.student_id
+            WHERE e.semester = $1
+            GROUP BY s.student_id, s.first_name, s.last_name
+            ORDER BY avg_grade DESC
+            LIMIT 10
+        """,
+        "type": "varchar",
+        "domain": "SELECT semester, COUNT(*) FROM Enrollments GROUP BY 1",
+    },
+}
+
+PLAN_CACHE_MODES = ["force_custom_plan", "force_generic_plan", "auto"]
+
+
+def load_domain(cursor, template):
+    """Distinct parameter values in the data, most frequent first: (values, counts)."""
+    cursor.execute(template["domain"])
+    rows = sorted(cursor.fetchall(), key=lambda r: (-r[1], str(r[0])))
+    return [r[0] for r in rows], np.array([r[1] for r in rows], dtype=float)
+
+
+def parameter_sampler(values, counts, distribution="uniform", rng=None, zipf_s=1.1):
+    """
+    Returns a function drawing one parameter value per call.
+
+    Args:
+        values: distinct values, most frequent first
+        counts: occurrences of each value in the data
+        distribution: "data", "uniform" or "zipf"
+        zipf_s: Zipf exponent
+    """
+    rng = rng or np.random.default_rng(0)
+    if distribution == "zipf":
+        weights = 1.0 / np.arange(1, len(values) + 1) ** zipf_s
+    elif distribution == "data":
+        weights = np.asarray(counts, dtype=float)
+    else:
+        weights = np.ones(len(values))
+    p = weights / weights.sum()
+    return lambda: values[rng.choice(len(values), p=p)]
+
+
+def _explain_execute(cursor, statement, value):
+    cursor.execute(f"EXPLAIN (ANALYZE, TIMING OFF, FORMAT JSON) EXECUTE {statement} (%s);", (value,))
+    explain = cursor.fetchone()[0][0]
+    return {
+        "value": value,
+        "planning_ms": explain.get("Planning Time", 0.0),
+        "execution_ms": explain["Execution Time"],
+        "total_cost": explain["Plan"]["Total Cost"],
+        "node_type": explain["Plan"]["Node Type"],
+    }
+
+
+def run_template(cursor, name, template, params, mode, explain_values=3):
+    """
+    Executes one prepared template for every drawn parameter under one plan_cache_mode.
+
+    Returns:
+        dict with the latency summary, the spread across parameter values and
+        EXPLAIN ANALYZE EXECUTE results for a few values
+    """
+    statement = name.lower()
+    cursor.execute("SET plan_cache_mode = %s;", (mode,))
+    cursor.execute(f"PREPARE {statement} ({template['type']}) AS {template['sql']};")
+
+    by_value = {}
+    for value in params:
+        start = time.perf_counter()
+        cursor.execute(f"EXECUTE {statement} (%s);", (value,))
+        cursor.fetchall()
+        by_value.setdefault(value, []).append((time.perf_counter() - start) * 1000)
+
+    latencies = [ms for values in by_value.values() for ms in values]
+    per_value = {str(v): round(float(np.median(ms)), 3) for v, ms in by_value.items()}
+    slowest = max(per_value, key=per_value.get)
+    fastest = min(per_value, key=per_value.get)
+    explains = [_explain_execute(cursor, statement, v) for v in list(by_value)[:explain_values]]
+
+    cursor.execute(f"DEALLOCATE {statement};")
+    cursor.execute("RESET plan_cache_mode;")
+    return {
+        "mode": mode,
+        "executions": len(latencies),
+        "distinct_values": len(by_value),
+        "latency_ms": summarize(latencies),
+        "spread": {
+            "per_value_p50_ms": per_value,
+            "slowest": {"value": slowest, "p50_ms": per_value[slowest]},
+            "fastest": {"value": fastest, "p50_ms": per_value[fastest]},
+            "ratio": round(per_value[slowest] / max(per_value[fastest], 1e-6), 2),
+        },
+        "explain": explains,
+    }
+
+
+def run(scale=None, distribution="uniform", draws=50, modes=PLAN_CACHE_MODES, templates=TEMPLATES, seed=0):
+    """
+    Runs the randomized workload: the same parameter draws for every plan_cache_mode.
+
+    Returns:
+        {template: {mode: result}}; saved as results/workload_<distribution>_<scale>.json
+        when a scale is given
+    """
+    conn, cursor = connect_db()
+    conn.autocommit = True
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    for name, template in templates.items():
+        values, counts = load_domain(cursor, template)
+        sample = parameter_sampler(values, counts, distribution, rng)
+        params = [sample() for _ in range(draws)]
+        results[name] = {}
+        for mode in modes:
+            result = run_template(cursor, name, template, params, mode)
+            results[name][mode] = result
+            planning = statistics.mean(e["planning_ms"] for e in result["explain"])
+            print(
+                f"{name:<24} {mode:<19} p50 {result['latency_ms']['p50']:>9.2f} ms | "
+                f"p95 {result['latency_ms']['p95']:>9.2f} ms | spread x{result['spread']['ratio']:<7} "
+                f"({result['distinct_values']} values) | planning {planning:.2f} ms"
+            )
+    cursor.close()
+    conn.close()
+
+    if scale is not None:
+        path = RESULTS_DIR / f"workload_{distribution}_{scale}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"scale": scale, "distribution": distribution, "draws": draws, "seed": seed,
+                       "templates": results}, f, indent=2, default=str)
+        print(f"📄 Workload results saved to '{path}'")
+    return results
+
+
+if __name__ == "__main__":
+    from snapshots import ensure_dataset
+
+    for scale in [1000, 10000, 100000, 1000000]:
+        print(f"\n=== Randomized workload for {scale} students ===")
+        ensure_dataset(scale, seed=scale)
+        for distribution in ("data", "uniform", "zipf"):
+            run(scale, distribution)
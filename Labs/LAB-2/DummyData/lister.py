@@ -0,0 +1,244 @@
+"""
+Paginated Parallel Prefix Lister with a Local Listing Cache
+-----------------------------------------------------------
+A single list_objects_v2 call returns at most 1,000 keys, and walking a
+large prefix page by page is one round trip after another. This engine:
+
+- list_serial(): the baseline, every page of a prefix through the paginator
+- list_parallel(): lists a prefix with Delimiter='/' and fans the
+  sub-prefixes found (courses/ -> CS101/ -> weeks/, submissions/ -> course
+  -> assignment -> student) out to a thread pool. Narrow levels are
+  descended; a wide level is split into contiguous key ranges, one per page
+  of sub-prefixes (StartAfter = first sub-prefix), each paginated without a
+  delimiter. Objects are streamed as a generator while the rest
+  is still being listed.
+- ListingCache: keeps complete listings per prefix (optionally persisted as
+  JSON). A cached prefix also answers any prefix below it. invalidate(prefix)
+  drops every listing that overlaps `prefix`, so a writer only invalidates
+  what it touched.
+
+Objects are yielded as {Key, Size, ETag, LastModified (ISO string)}.
+
+Usage:
+    python lister.py submissions/ [--workers 32 --compare]
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import boto3
+
+BUCKET = "hasaan-lms-lab2"
+REGION = "ap-south-1"
+
+
+def _object(obj):
+    return {"Key": obj["Key"], "Size": obj["Size"], "ETag": obj.get("ETag"),
+            "LastModified": obj["LastModified"].isoformat() if "LastModified" in obj else None}
+
+
+def list_serial(s3, bucket, prefix=""):
+    """Every object under `prefix`, one page after another."""
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            yield _object(obj)
+
+
+def _list_range(s3, bucket, prefix, first, end):
+    """
+    Objects under the sub-prefixes of `prefix` from sub-prefix `first` up to
+    (excluding) key `end`, paginated without a delimiter. Objects directly
+    under `prefix` are skipped: the level listing returns them.
+    """
+    paginator = s3.get_paginator("list_objects_v2")
+    # keys under `first` all sort after `first` without its trailing '/'
+    objects = []
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, StartAfter=first[:-1]):
+        for obj in page.get("Contents", []):
+            if obj["Key"] < first:
+                # a sibling extending `first` with a character below '/' ("s1-late/" < "s1/")
+                # sorts in between and belongs to the previous range
+                continue
+            if end is not None and obj["Key"] >= end:
+                return objects
+            if "/" in obj["Key"][len(prefix):]:
+                objects.append(_object(obj))
+    return objects
+
+
+def list_parallel(s3, bucket, prefix="", workers=16, max_depth=4):
+    """
+    Every object under `prefix`, listing sub-prefixes concurrently.
+
+    A level whose Delimiter='/' listing is one page with at most `workers`
+    sub-prefixes (courses, weeks, assignments) is descended prefix by prefix.
+    A wider level (thousands of student folders holding a file or two) is
+    not: each page of its sub-prefixes becomes one key range, handed to the
+    pool as soon as the page arrives and paginated without a delimiter, so
+    tiny folders do not cost one request each.
+
+    Args:
+        workers: listings run at once
+        max_depth: levels descended before the rest of a sub-prefix is
+            listed as one range
+
+    Yields:
+        object dicts, in no particular order
+    """
+    results = queue.Queue()
+    stop = threading.Event()
+    pending = [0]
+    lock = threading.Lock()
+
+    def submit(fn, *args):
+        with lock:
+            pending[0] += 1
+        pool.submit(run, fn, *args)
+
+    def run(fn, *args):
+        try:
+            if not stop.is_set():
+                results.put(("objects", fn(*args)))
+        except Exception as e:
+            results.put(("error", e))
+        finally:
+            results.put(("done", None))
+
+    def level(p, depth):
+        if depth >= max_depth:
+            return list(list_serial(s3, bucket, p))
+        objects, narrow = [], []
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=p, Delimiter="/"):
+            objects.extend(_object(obj) for obj in page.get("Contents", []))
+            prefixes = [c["Prefix"] for c in page.get("CommonPrefixes", [])]
+            if narrow is not None and not page.get("IsTruncated") and len(prefixes) <= workers:
+                narrow.extend(prefixes)
+                continue
+            for sub in narrow or []:
+                submit(level, sub, depth + 1)
+            narrow = None
+            if prefixes:
+                # '0' sorts right after '/', so the range ends past every key under the last sub-prefix
+                submit(_list_range, s3, bucket, p, prefixes[0], prefixes[-1][:-1] + "0")
+        for sub in narrow or []:
+            submit(level, sub, depth + 1)
+        return objects
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        submit(level, prefix, 0)
+        while True:
+            kind, value = results.get()
+            if kind == "objects":
+                yield from value
+            elif kind == "error":
+                raise value
+            else:
+                with lock:
+                    pending[0] -= 1
+                    if pending[0] == 0:
+                        break
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ListingCache:
+    """Complete listings per prefix, answered for the prefix and everything below it."""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.entries = {}  # prefix -> {"time": listed at, "objects": [...]}
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                self.entries = json.load(f)
+
+    def get(self, prefix):
+        """Objects under `prefix` from the closest cached listing that covers it, or None."""
+        covering = [p for p in self.entries if prefix.startswith(p)]
+        if not covering:
+            return None
+        entry = self.entries[max(covering, key=len)]
+        if self.ttl is not None and time.time() - entry["time"] > self.ttl:
+            return None
+        return [obj for obj in entry["objects"] if obj["Key"].startswith(prefix)]
+
+    def put(self, prefix, objects):
+        # a listing of `prefix` supersedes the cached listings below it
+        for p in [p for p in self.entries if p.startswith(prefix)]:
+            del self.entries[p]
+        self.entries[prefix] = {"time": time.time(), "objects": objects}
+        self.save()
+
+    def invalidate(self, prefix=""):
+        """Drops every listing that overlaps `prefix` (above it or below it); returns how many."""
+        stale = [p for p in self.entries if p.startswith(prefix) or prefix.startswith(p)]
+        for p in stale:
+            del self.entries[p]
+        self.save()
+        return len(stale)
+
+    def save(self):
+        if self.path:
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+
+
+def list_objects(s3, bucket, prefix="", workers=16, cache=None, max_depth=4):
+    """
+    Every object under `prefix`: from `cache` when it covers the prefix,
+    otherwise listed in parallel (and cached once the listing is complete).
+    """
+    if cache is not None:
+        cached = cache.get(prefix)
+        if cached is not None:
+            yield from cached
+            return
+    listed = [] if cache is not None else None
+    for obj in list_parallel(s3, bucket, prefix, workers, max_depth):
+        if listed is not None:
+            listed.append(obj)
+        yield obj
+    if cache is not None:
+        cache.put(prefix, listed)
+
+
+def compare(s3, bucket, prefix="", workers=16):
+    """Times a serial scan against the parallel lister; returns both timings and the object count."""
+    timings = {}
+    for name, listing in (("serial", lambda: list_serial(s3, bucket, prefix)),
+                          ("parallel", lambda: list_parallel(s3, bucket, prefix, workers))):
+        start = time.perf_counter()
+        count = sum(1 for _ in listing())
+        timings[name] = round(time.perf_counter() - start, 3)
+    print(f"📂 {count} objects under '{prefix}': serial {timings['serial']:.2f}s, "
+          f"parallel ({workers} workers) {timings['parallel']:.2f}s, "
+          f"x{timings['serial'] / max(timings['parallel'], 1e-6):.1f}")
+    return {"objects": count, **timings}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List a prefix of the LMS bucket")
+    parser.add_argument("prefix", nargs="?", default="")
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--compare", action="store_true", help="time a serial scan against the parallel lister")
+    args = parser.parse_args()
+
+    s3 = boto3.client("s3", region_name=REGION)
+    if args.compare:
+        compare(s3, args.bucket, args.prefix, args.workers)
+    else:
+        for obj in list_objects(s3, args.bucket, args.prefix, args.workers):
+            print(" -", obj["Key"], f"({obj['Size']} bytes)")
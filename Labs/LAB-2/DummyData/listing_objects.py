@@ -1,17 +1,23 @@
 import boto3
 
+from lister import ListingCache, list_objects as list_all
+
 bucket = "hasaan-lms-lab2"
 region = "ap-south-1"
 
 s3 = boto3.client("s3", region_name=region)
 
+# listings are kept here until a writer invalidates their prefix
+cache = ListingCache()
+
 def list_objects(prefix):
     print(f" Listing objects under: {prefix}\n")
-    resp = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-    if "Contents" in resp:
-        for obj in resp["Contents"]:
-            print(" -", obj["Key"], f"({obj['Size']} bytes)")
-    else:
+    found = False
+    # every page, sub-prefixes listed in parallel
+    for obj in list_all(s3, bucket, prefix, cache=cache):
+        found = True
+        print(" -", obj["Key"], f"({obj['Size']} bytes)")
+    if not found:
         print("No objects found under this prefix.")
 
 list_objects("courses/CS202/weeks/week02/")
@@ -1,30 +1,34 @@
-import subprocess
+import boto3
 import requests
 import os
+from botocore.exceptions import BotoCoreError, ClientError
+
+from presigner import Presigner
 
 bucket = "hasaan-lms-lab2"
 key = "submissions/CS101/assignment1/2023001/assignment.pdf"
 region = "ap-south-1"
 local_filename = "download_using_url.pdf"
 
-# 1. Generate presigned URL using AWS CLI
-cmd = [
-    "aws", "s3", "presign",
-    f"s3://{bucket}/{key}",
-    "--region", region,
-    "--expires-in", "3600"
-]
+# 1. Generate presigned URL in-process (no `aws s3 presign` subprocess per URL)
+s3 = boto3.client("s3", region_name=region)
+presigner = Presigner(s3, bucket, expires_in=3600)
 
 print("------------------------------------------------------------")
 print(f"Bucket region: {region}")
 
 try:
-    presigned_url = subprocess.check_output(cmd, text=True).strip()
+    presigned_url = presigner.url(key)
     print("Presigned URL:", presigned_url)
-except subprocess.CalledProcessError as e:
+except (BotoCoreError, ClientError) as e:
     print("❌ Failed to generate presigned URL:", e)
     exit(1)
 
+# Grade release: one call signs the links for every submission of the assignment
+submissions = [f"submissions/CS101/assignment1/{student}/assignment.pdf" for student in ("2023001", "2023002")]
+for sub_key, url in presigner.urls(submissions).items():
+    print(f" - {sub_key}: {url[:80]}...")
+
 # 2. Download the file
 resp = requests.get(presigned_url)
 print("Status:", resp.status_code)
@@ -0,0 +1,195 @@
+"""
+In-Process Bulk Presigner with a URL Cache
+------------------------------------------
+`aws s3 presign` signs one URL per process: every link pays the start-up of
+a Python interpreter and the AWS CLI before a few microseconds of HMAC
+work. When grades are released every student submission needs a download
+link, so here the signing happens in-process with the boto3 client:
+
+- Presigner.urls(keys) signs any number of keys with generate_presigned_url
+  (GET downloads by default, or any client method such as put_object).
+  Signing is local computation, no request is sent to S3.
+- Presigner.posts(keys) does the same with generate_presigned_post, for
+  browser form uploads of submissions.
+- Signed URLs are cached per (bucket, key, method, params, expiry) and
+  handed out again until `margin` seconds before they expire, so a link is
+  never given out with less than `margin` seconds left to use it. With
+  temporary credentials a URL stops working when the session expires, so
+  keep `expires_in` within the session lifetime. Every insert drops the
+  entries past their re-sign point, and the oldest ones beyond
+  `max_entries`, so a long-running process does not grow the cache forever.
+- benchmark() compares URLs signed per second: `aws s3 presign` subprocesses
+  against the in-process presigner, uncached and cached.
+
+Usage:
+    python presigner.py submissions/CS101/ [--expires-in 3600]
+    python presigner.py --benchmark [--keys 5000 --cli-keys 20]
+"""
+
+import argparse
+import json
+from collections import OrderedDict
+import shutil
+import subprocess
+import threading
+import time
+
+import boto3
+
+from lister import list_objects
+
+BUCKET = "hasaan-lms-lab2"
+REGION = "ap-south-1"
+
+EXPIRES_IN = 3600  # seconds a signed URL is valid
+MARGIN = 300       # cached URLs are re-signed this many seconds before they expire
+MAX_ENTRIES = 100_000  # signed URLs kept in the cache at most
+
+
+class Presigner:
+    """Signs URLs for many keys in-process and caches them until shortly before expiry."""
+
+    def __init__(self, s3, bucket=BUCKET, expires_in=EXPIRES_IN, margin=MARGIN, max_entries=MAX_ENTRIES):
+        if margin >= expires_in:
+            raise ValueError("margin must be shorter than expires_in")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.s3 = s3
+        self.bucket = bucket
+        self.expires_in = expires_in
+        self.margin = margin
+        self.max_entries = max_entries
+        # (kind, bucket, key, method, params, expires_in) -> (signed, expires_at), oldest first
+        self.cache = OrderedDict()
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+    def _cached(self, cache_key, sign):
+        now = time.time()
+        with self.lock:
+            entry = self.cache.get(cache_key)
+            if entry and now < entry[1] - self.margin:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        signed = sign()
+        with self.lock:
+            self.cache.pop(cache_key, None)
+            self.cache[cache_key] = (signed, now + self.expires_in)
+            # every entry has the same lifetime, so the oldest are the first to go stale
+            while self.cache:
+                _, expires_at = next(iter(self.cache.values()))
+                if len(self.cache) <= self.max_entries and now < expires_at - self.margin:
+                    break
+                self.cache.popitem(last=False)
+        return signed
+
+    def url(self, key, method="get_object", params=None):
+        """One presigned URL for `key` (see urls)."""
+        params = params or {}
+        return self._cached(
+            ("url", self.bucket, key, method, json.dumps(params, sort_keys=True), self.expires_in),
+            lambda: self.s3.generate_presigned_url(
+                method, Params={"Bucket": self.bucket, "Key": key, **params}, ExpiresIn=self.expires_in))
+
+    def urls(self, keys, method="get_object", params=None):
+        """
+        Presigned URLs for a batch of keys.
+
+        Args:
+            method: client method the URL performs (get_object, put_object, ...)
+            params: extra request parameters signed into every URL, e.g.
+                {"ResponseContentDisposition": "attachment"}
+
+        Returns:
+            {key: url}
+        """
+        return {key: self.url(key, method, params) for key in keys}
+
+    def post(self, key, fields=None, conditions=None):
+        """One presigned POST for `key` (see posts)."""
+        return self._cached(
+            ("post", self.bucket, key, "post_object", json.dumps([fields, conditions], sort_keys=True), self.expires_in),
+            lambda: self.s3.generate_presigned_post(
+                self.bucket, key, Fields=fields, Conditions=conditions, ExpiresIn=self.expires_in))
+
+    def posts(self, keys, fields=None, conditions=None):
+        """
+        Presigned POST forms for a batch of keys.
+
+        Args:
+            fields, conditions: as for generate_presigned_post, e.g.
+                conditions=[["content-length-range", 0, 20 * 1024 ** 2]]
+
+        Returns:
+            {key: {"url": ..., "fields": {...}}}
+        """
+        return {key: self.post(key, fields, conditions) for key in keys}
+
+    def purge(self):
+        """Drops cached entries that are past their re-sign point; returns how many."""
+        now = time.time()
+        with self.lock:
+            stale = [k for k, (_, expires_at) in self.cache.items() if now >= expires_at - self.margin]
+            for k in stale:
+                del self.cache[k]
+        return len(stale)
+
+
+def cli_presign(bucket, key, region=REGION, expires_in=EXPIRES_IN):
+    """A presigned URL from an `aws s3 presign` subprocess (the old way)."""
+    cmd = ["aws", "s3", "presign", f"s3://{bucket}/{key}", "--region", region, "--expires-in", str(expires_in)]
+    return subprocess.check_output(cmd, text=True).strip()
+
+
+def benchmark(s3, bucket=BUCKET, keys=5000, cli_keys=20):
+    """
+    URLs signed per second: `aws s3 presign` subprocesses (on `cli_keys`
+    keys, when the CLI is installed) against the in-process presigner on
+    `keys` keys, cold and then served from the cache.
+    """
+    names = [f"submissions/CS101/assignment1/{2023000 + i}/assignment.pdf" for i in range(keys)]
+    results = {}
+
+    if shutil.which("aws"):
+        start = time.perf_counter()
+        for key in names[:cli_keys]:
+            cli_presign(bucket, key, s3.meta.region_name)
+        seconds = time.perf_counter() - start
+        results["cli"] = {"urls": cli_keys, "seconds": round(seconds, 3), "urls_per_s": round(cli_keys / seconds, 1)}
+    else:
+        print("⚠️ aws CLI not found, skipping the subprocess baseline")
+
+    presigner = Presigner(s3, bucket)
+    for name in ("in_process", "cached"):
+        start = time.perf_counter()
+        presigner.urls(names)
+        seconds = time.perf_counter() - start
+        results[name] = {"urls": keys, "seconds": round(seconds, 3), "urls_per_s": round(keys / seconds, 1)}
+
+    for name, r in results.items():
+        print(f"🔏 {name:<10} {r['urls']:>6} URLs in {r['seconds']:.3f}s  ({r['urls_per_s']:,.0f} URLs/s)")
+    if "cli" in results:
+        print(f"   in-process signing is x{results['in_process']['urls_per_s'] / results['cli']['urls_per_s']:,.0f} "
+              f"the subprocess rate")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Presign download links for every object under a prefix")
+    parser.add_argument("prefix", nargs="?", default="submissions/")
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("--expires-in", type=int, default=EXPIRES_IN)
+    parser.add_argument("--benchmark", action="store_true", help="compare URLs/s against `aws s3 presign`")
+    parser.add_argument("--keys", type=int, default=5000, help="keys signed in-process by --benchmark")
+    parser.add_argument("--cli-keys", type=int, default=20, help="keys signed by the CLI in --benchmark")
+    args = parser.parse_args()
+
+    s3 = boto3.client("s3", region_name=REGION)
+    if args.benchmark:
+        benchmark(s3, args.bucket, args.keys, args.cli_keys)
+    else:
+        presigner = Presigner(s3, args.bucket, args.expires_in, margin=min(MARGIN, args.expires_in // 2))
+        keys = [obj["Key"] for obj in list_objects(s3, args.bucket, args.prefix)]
+        for key, url in presigner.urls(keys).items():
+            print(key, url)
@@ -0,0 +1,367 @@
+"""
+Manifest-driven Concurrent Uploader for Course Material
+-------------------------------------------------------
+Publishes a local directory tree to the LMS bucket:
+
+1. build_manifest() walks the tree and maps every file to its S3 key with
+   KEY_RULES (regexes on the path relative to the root), e.g.
+   slides_CS101_week1.pdf -> courses/CS101/weeks/week01/slides.pdf.
+   Files that match no rule are skipped and listed.
+2. upload_manifest() uploads the files over a thread pool. Each upload goes
+   through boto3's transfer manager: files above `multipart_threshold` are
+   sent as a multipart upload of `part_size` parts, `part_concurrency` parts
+   at a time.
+3. The report gives files, bytes, elapsed time, MB/s, files/s and the keys
+   that failed.
+
+With sync=True only new or changed files are uploaded, so a re-run over an
+unchanged tree sends nothing and creates no new object versions:
+
+- a local index (<root>/.s3_index.json) keeps, per key, the path, size,
+  mtime, SHA-256 and the ETag the upload produced
+- the bucket's current ETags come from one paginated listing per top-level
+  prefix (1,000 keys per request), not one HEAD per file
+- a file whose size and mtime match the index and whose indexed ETag is the
+  remote one is skipped without being read; a file that was only touched is
+  hashed once and skipped if its content is unchanged; a file missing from
+  the index is skipped if its locally computed ETag (MD5, or the MD5 of the
+  part MD5s for multipart) equals the remote one
+- files that are uploaded are hashed while the upload reads them
+  (_HashingReader), not in a second pass
+
+Every function takes the S3 client as an argument, so the uploader runs
+unchanged against a local stand-in such as moto:
+
+    from moto import mock_aws
+    with mock_aws():
+        s3 = boto3.client("s3", region_name=REGION)
+        s3.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": REGION})
+        upload_manifest(s3, BUCKET, build_manifest(root)[0])
+
+Usage:
+    python publisher.py DummyData [--workers 16 --part-size-mb 16 --dry-run]
+    python publisher.py DummyData --sync
+"""
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+
+BUCKET = "hasaan-lms-lab2"
+REGION = "ap-south-1"
+
+MB = 1024 ** 2
+INDEX_NAME = ".s3_index.json"
+
+# (pattern on the POSIX path relative to the root, key template); first match wins
+KEY_RULES = [
+    (r"^slides_(?P<course>[A-Z]+\d+)_week(?P<week>\d+)\.pdf$", "courses/{course}/weeks/week{week:0>2}/slides.pdf"),
+    (r"^marks_(?P<course>[A-Z]+\d+)\.csv$", "datasets/{course}/marks.csv"),
+    (r"^announcements-(?P<date>\d{4}-\d{2}-\d{2})\.txt$", "announcements/{date}.txt"),
+    (r"^sub_(?P<course>[A-Z]+\d+)_(?P<student>\d+)_(?P<assignment>\w+)\.pdf$",
+     "submissions/{course}/{assignment}/{student}/assignment.pdf"),
+    # trees already laid out like the bucket are published as they are
+    (r"^(?P<path>(courses|datasets|submissions|announcements)/.+)$", "{path}"),
+]
+
+
+def map_key(relative_path, rules=KEY_RULES):
+    """S3 key for a path relative to the root, or None if no rule matches."""
+    name = relative_path.split("/")[-1]
+    for pattern, template in rules:
+        match = re.match(pattern, relative_path) or re.match(pattern, name)
+        if match:
+            return template.format(**match.groupdict())
+    return None
+
+
+def build_manifest(root, rules=KEY_RULES):
+    """
+    Walks `root` and maps every file to its key.
+
+    Returns:
+        (manifest, skipped): manifest is a list of {path, key, size,
+        content_type}; skipped lists the relative paths no rule matched
+    """
+    root = Path(root)
+    manifest, skipped, keys = [], [], {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            path = Path(dirpath) / filename
+            relative = path.relative_to(root).as_posix()
+            key = map_key(relative, rules)
+            if key is None:
+                skipped.append(relative)
+                continue
+            if key in keys:
+                raise ValueError(f"{relative} and {keys[key]} both map to {key}")
+            keys[key] = relative
+            manifest.append({
+                "path": str(path),
+                "key": key,
+                "size": path.stat().st_size,
+                "content_type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            })
+    return manifest, skipped
+
+
+def transfer_config(part_size=8 * MB, part_concurrency=4, multipart_threshold=None):
+    """boto3 TransferConfig: multipart above the threshold (default: one part), `part_concurrency` parts at once."""
+    return TransferConfig(
+        multipart_threshold=multipart_threshold or part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=part_concurrency,
+        use_threads=part_concurrency > 1,
+    )
+
+
+def _upload_all(manifest, upload, workers):
+    """Runs upload(entry) for every entry over a thread pool; returns (uploaded entries, failed, seconds)."""
+    uploaded, failed = [], {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(upload, entry): entry for entry in manifest}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failed[entry["key"]] = f"{e.__class__.__name__}: {e}"
+                print(f"❌ Failed: {entry['key']} ({failed[entry['key']]})")
+                continue
+            uploaded.append(entry)
+            print("✅ Uploaded:", entry["key"])
+    return uploaded, failed, time.perf_counter() - start
+
+
+def _report(uploaded, failed, seconds, workers, part_size, part_concurrency):
+    uploaded_bytes = sum(entry["size"] for entry in uploaded)
+    report = {
+        "files": len(uploaded),
+        "bytes": uploaded_bytes,
+        "seconds": round(seconds, 3),
+        "mb_per_s": round(uploaded_bytes / MB / seconds, 2) if seconds else 0.0,
+        "files_per_s": round(len(uploaded) / seconds, 2) if seconds else 0.0,
+        "failed": failed,
+        "workers": workers,
+        "part_size": part_size,
+        "part_concurrency": part_concurrency,
+    }
+    print(f"📤 {len(uploaded)} files, {uploaded_bytes / MB:.1f} MB in {seconds:.2f}s: "
+          f"{report['mb_per_s']} MB/s, {report['files_per_s']} files/s, {len(failed)} failed")
+    return report
+
+
+def upload_manifest(s3, bucket, manifest, workers=8, part_size=8 * MB, part_concurrency=4,
+                    multipart_threshold=None):
+    """
+    Uploads every manifest entry, `workers` files at a time.
+
+    Returns:
+        report dict with files, bytes, seconds, mb_per_s, files_per_s and
+        failed ({key: error})
+    """
+    config = transfer_config(part_size, part_concurrency, multipart_threshold)
+
+    def upload(entry):
+        s3.upload_file(entry["path"], bucket, entry["key"],
+                       ExtraArgs={"ContentType": entry["content_type"]}, Config=config)
+
+    uploaded, failed, seconds = _upload_all(manifest, upload, workers)
+    return _report(uploaded, failed, seconds, workers, part_size, part_concurrency)
+
+
+# ---------- Incremental sync ----------
+
+class _HashingReader:
+    """
+    Read-only file wrapper that computes, from the bytes the uploader reads,
+    the SHA-256 of the content and the ETag S3 will give the object: the MD5
+    for a single PUT, or the MD5 of the part MD5s plus "-<parts>" for a
+    multipart upload of `part_size` parts. Having no seek(), it is read once
+    and sequentially by the transfer manager.
+    """
+
+    def __init__(self, fileobj, part_size):
+        self.fileobj = fileobj
+        self.part_size = part_size
+        self.sha256 = hashlib.sha256()
+        self.md5 = hashlib.md5()
+        self.part_md5s = []
+        self.part = hashlib.md5()
+        self.part_bytes = 0
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.update(data)
+        return data
+
+    def update(self, data):
+        self.sha256.update(data)
+        self.md5.update(data)
+        view = memoryview(data)
+        while view:
+            take = min(len(view), self.part_size - self.part_bytes)
+            self.part.update(view[:take])
+            self.part_bytes += take
+            view = view[take:]
+            if self.part_bytes == self.part_size:
+                self.part_md5s.append(self.part.digest())
+                self.part, self.part_bytes = hashlib.md5(), 0
+
+    def etag(self, multipart):
+        if not multipart:
+            return f'"{self.md5.hexdigest()}"'
+        digests = self.part_md5s + ([self.part.digest()] if self.part_bytes else [])
+        return f'"{hashlib.md5(b"".join(digests)).hexdigest()}-{len(digests)}"'
+
+
+def file_digests(path, part_size, multipart, chunk=MB):
+    """(sha256, expected ETag) of a local file in one pass, for files that are not uploaded."""
+    reader = _HashingReader(open(path, "rb"), part_size)
+    with reader.fileobj:
+        while reader.read(chunk):
+            pass
+    return reader.sha256.hexdigest(), reader.etag(multipart)
+
+
+def load_index(path):
+    if Path(path).exists():
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_index(index, path):
+    """Writes the index atomically, so an interrupted sync cannot corrupt it."""
+    tmp = Path(path).with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def remote_etags(s3, bucket, keys):
+    """{key: ETag} of the current objects under the top-level prefixes of `keys`, by paginated listing."""
+    prefixes = sorted({key.split("/")[0] + "/" for key in keys})
+    etags = {}
+    paginator = s3.get_paginator("list_objects_v2")
+    for prefix in prefixes:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                etags[obj["Key"]] = obj["ETag"]
+    return etags
+
+
+def plan_sync(manifest, index, remote, part_size, multipart_threshold):
+    """
+    Splits the manifest into entries to upload and entries already in the
+    bucket; refreshes the index entries of unchanged files it had to hash.
+
+    Returns:
+        (to_upload, unchanged, hashed): hashed counts files read to decide
+    """
+    to_upload, unchanged, hashed = [], [], 0
+    for entry in manifest:
+        stat = os.stat(entry["path"])
+        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        record = index.get(entry["key"])
+        remote_etag = remote.get(entry["key"])
+        if remote_etag is None:
+            to_upload.append(entry)
+            continue
+        if (record and record["etag"] == remote_etag and record["size"] == stat.st_size
+                and record["mtime_ns"] == stat.st_mtime_ns):
+            unchanged.append(entry)
+            continue
+        # Touched, or never indexed: the content decides
+        sha256, etag = file_digests(entry["path"], part_size, stat.st_size >= multipart_threshold)
+        hashed += 1
+        if etag == remote_etag:
+            index[entry["key"]] = {"path": entry["path"], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                   "sha256": sha256, "etag": etag}
+            unchanged.append(entry)
+        else:
+            to_upload.append(entry)
+    return to_upload, unchanged, hashed
+
+
+def sync_manifest(s3, bucket, manifest, index_path, workers=8, part_size=8 * MB, part_concurrency=4,
+                  multipart_threshold=None):
+    """
+    Uploads only the manifest entries that are new or changed (see the module
+    docstring) and records every uploaded file in the index at `index_path`.
+
+    Returns:
+        upload_manifest's report plus unchanged (files skipped) and hashed
+        (skipped files that had to be read to decide)
+    """
+    multipart_threshold = multipart_threshold or part_size
+    config = transfer_config(part_size, part_concurrency, multipart_threshold)
+    index = load_index(index_path)
+    start = time.perf_counter()
+    remote = remote_etags(s3, bucket, [entry["key"] for entry in manifest])
+    to_upload, unchanged, hashed = plan_sync(manifest, index, remote, part_size, multipart_threshold)
+    planning = time.perf_counter() - start
+
+    def upload(entry):
+        with open(entry["path"], "rb") as f:
+            reader = _HashingReader(f, part_size)
+            s3.upload_fileobj(reader, bucket, entry["key"],
+                              ExtraArgs={"ContentType": entry["content_type"]}, Config=config)
+        index[entry["key"]] = {"path": entry["path"], "size": entry["size"], "mtime_ns": entry["mtime_ns"],
+                               "sha256": reader.sha256.hexdigest(),
+                               "etag": reader.etag(entry["size"] >= multipart_threshold)}
+
+    uploaded, failed, seconds = _upload_all(to_upload, upload, workers)
+    save_index(index, index_path)
+    report = _report(uploaded, failed, planning + seconds, workers, part_size, part_concurrency)
+    report.update(unchanged=len(unchanged), hashed=hashed, planning_seconds=round(planning, 3))
+    print(f"🔁 {len(unchanged)} unchanged files skipped ({hashed} hashed to decide), "
+          f"compared in {planning:.2f}s")
+    return report
+
+
+def publish(root, s3=None, bucket=BUCKET, dry_run=False, sync=False, **options):
+    """
+    Builds the manifest for `root` and uploads it (or only prints it with
+    dry_run); sync=True uploads only new or changed files, tracked in
+    <root>/.s3_index.json.
+    """
+    manifest, skipped = build_manifest(root)
+    for relative in skipped:
+        print(f"⏭️ No rule for {relative}, skipped")
+    if dry_run:
+        print(json.dumps(manifest, indent=2))
+        return {"manifest": manifest, "skipped": skipped}
+    s3 = s3 or boto3.client("s3", region_name=REGION)
+    if sync:
+        report = sync_manifest(s3, bucket, manifest, Path(root) / INDEX_NAME, **options)
+    else:
+        report = upload_manifest(s3, bucket, manifest, **options)
+    report["skipped"] = skipped
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish a directory tree to the LMS bucket")
+    parser.add_argument("root", nargs="?", default=str(Path(__file__).parent))
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("--workers", type=int, default=8, help="files uploaded at once")
+    parser.add_argument("--part-size-mb", type=int, default=8)
+    parser.add_argument("--part-concurrency", type=int, default=4, help="parts of one file uploaded at once")
+    parser.add_argument("--dry-run", action="store_true", help="print the manifest without uploading")
+    parser.add_argument("--sync", action="store_true", help="upload only new or changed files")
+    args = parser.parse_args()
+    publish(args.root, bucket=args.bucket, dry_run=args.dry_run, sync=args.sync, workers=args.workers,
+            part_size=args.part_size_mb * MB, part_concurrency=args.part_concurrency)
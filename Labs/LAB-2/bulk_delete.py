@@ -0,0 +1,234 @@
+"""
+Bulk Delete and Batched Verification for S3 Cleanup
+---------------------------------------------------
+Deleting a course at the end of term means hundreds of thousands of keys;
+one delete_object and one head_object per key is two round trips per key.
+Here:
+
+- delete_keys() takes any stream of keys (strings, (key, version_id) pairs
+  or {"Key", "VersionId"} dicts), cuts it into batches of 1,000 (the
+  delete_objects maximum) and sends `workers` delete_objects requests at
+  once, with a bounded number in flight so the stream is never fully
+  loaded in memory. Quiet mode is used, so a response carries only the
+  per-key errors, which are collected in the report.
+- delete_prefix() lists the keys under a prefix with the parallel lister;
+  with versions=True it lists every version and delete marker instead,
+  purging the prefix from a versioned bucket for good. Without versions, a
+  versioned bucket only gets delete markers. It keeps the listed keys in a
+  list (returned with the report) so they can be verified afterwards.
+- verify_deleted() checks the deleted keys in parallel batches: "list"
+  groups each sorted batch by folder and lists every folder once, from its
+  first to its last wanted key (a folder with a single key gets a HEAD), so
+  objects elsewhere in the bucket are never paged through; "head" sends
+  parallel HEADs and is needed for specific versions.
+
+Usage:
+    python bulk_delete.py courses/CS101/ [--versions] [--verify list|head]
+"""
+
+import argparse
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+import boto3
+from botocore.exceptions import ClientError
+
+from DummyData.lister import list_parallel
+
+BUCKET = "hasaan-lms-lab2"
+REGION = "ap-south-1"
+
+BATCH_SIZE = 1000  # delete_objects accepts at most 1,000 keys per request
+
+
+def _identifier(key):
+    """{"Key"[, "VersionId"]} for a key string, (key, version_id) pair or dict."""
+    if isinstance(key, str):
+        return {"Key": key}
+    if isinstance(key, dict):
+        return {k: key[k] for k in ("Key", "VersionId") if key.get(k)}
+    key, version_id = key
+    return {"Key": key, "VersionId": version_id} if version_id else {"Key": key}
+
+
+def batches(keys, size=BATCH_SIZE):
+    """Lists of at most `size` object identifiers from a stream of keys."""
+    keys = iter(keys)
+    while True:
+        batch = [_identifier(k) for k in islice(keys, size)]
+        if not batch:
+            return
+        yield batch
+
+
+def _run_batches(fn, keys, workers, batch_size):
+    """Runs fn(batch) over the key stream with at most 2 * `workers` batches in flight; yields results."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        for batch in batches(keys, batch_size):
+            in_flight.add(pool.submit(fn, batch))
+            if len(in_flight) >= 2 * workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in in_flight:
+            yield future.result()
+
+
+def delete_keys(s3, bucket, keys, workers=8, batch_size=BATCH_SIZE):
+    """
+    Deletes a stream of keys with concurrent delete_objects requests.
+
+    Returns:
+        report dict with requested, deleted, requests, seconds, keys_per_s
+        and errors (one {Key, VersionId, Code, Message} per failed key)
+    """
+    def delete(batch):
+        resp = s3.delete_objects(Bucket=bucket, Delete={"Objects": batch, "Quiet": True})
+        return len(batch), resp.get("Errors", [])
+
+    requested = requests = 0
+    errors = []
+    start = time.perf_counter()
+    for sent, failed in _run_batches(delete, keys, workers, batch_size):
+        requested += sent
+        requests += 1
+        errors.extend({k: e.get(k) for k in ("Key", "VersionId", "Code", "Message")} for e in failed)
+    seconds = time.perf_counter() - start
+
+    report = {
+        "requested": requested,
+        "deleted": requested - len(errors),
+        "requests": requests,
+        "seconds": round(seconds, 3),
+        "keys_per_s": round(requested / seconds, 1) if seconds else 0.0,
+        "errors": errors,
+    }
+    print(f"🗑️ Deleted {report['deleted']} of {requested} keys in {requests} requests, {seconds:.2f}s "
+          f"({report['keys_per_s']} keys/s), {len(errors)} errors")
+    for e in errors[:10]:
+        print(f"   ❌ {e['Key']} {e.get('VersionId') or ''}: {e['Code']} {e['Message']}")
+    return report
+
+
+def iter_versions(s3, bucket, prefix):
+    """Every version and delete marker under `prefix` as {Key, VersionId}."""
+    paginator = s3.get_paginator("list_object_versions")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for entry in page.get("Versions", []) + page.get("DeleteMarkers", []):
+            yield {"Key": entry["Key"], "VersionId": entry["VersionId"]}
+
+
+def delete_prefix(s3, bucket, prefix, versions=False, workers=8):
+    """
+    Deletes everything under `prefix`: the current objects, or with
+    versions=True every version and delete marker.
+
+    Returns:
+        (delete report, deleted identifiers) so they can be verified; the
+        identifiers are held in memory, unlike delete_keys' stream
+    """
+    if not prefix:
+        raise ValueError("refusing to delete the whole bucket; pass a prefix")
+    if versions:
+        keys = list(iter_versions(s3, bucket, prefix))
+    else:
+        keys = [{"Key": obj["Key"]} for obj in list_parallel(s3, bucket, prefix, workers)]
+    return delete_keys(s3, bucket, keys, workers), keys
+
+
+def verify_deleted(s3, bucket, keys, method="list", workers=8, batch_size=BATCH_SIZE):
+    """
+    Checks that keys are gone, in parallel batches.
+
+    Args:
+        method: "list" (one listing per folder of a sorted batch; current objects only)
+            or "head" (one HEAD per key, honouring VersionId)
+
+    Returns:
+        dict with checked, still_present (identifiers) and errors ({key: message})
+    """
+    def list_folder(folder, wanted):
+        first, last = min(wanted), max(wanted)
+        present = []
+        paginator = s3.get_paginator("list_objects_v2")
+        # a proper prefix of `first` sorts right before it
+        for page in paginator.paginate(Bucket=bucket, Prefix=folder, Delimiter="/", StartAfter=first[:-1]):
+            contents = page.get("Contents", [])
+            present.extend({"Key": obj["Key"]} for obj in contents if obj["Key"] in wanted)
+            if contents and contents[-1]["Key"] >= last:
+                break
+        return present
+
+    def check_list(batch):
+        folders = {}
+        for identifier in batch:
+            key = identifier["Key"]
+            folders.setdefault(key[:key.rfind("/") + 1], set()).add(key)
+        present, errors = [], {}
+        for folder, wanted in folders.items():
+            if len(wanted) > 1:
+                present.extend(list_folder(folder, wanted))
+                continue
+            # a lone key: one HEAD costs no more than a listing and reads nothing else
+            identifier = {"Key": next(iter(wanted))}
+            found, error = head(identifier)
+            if found:
+                present.append(found)
+            if error:
+                errors[identifier["Key"]] = error
+        return len(batch), present, errors
+
+    def head(identifier):
+        try:
+            s3.head_object(Bucket=bucket, **identifier)
+            return identifier, None
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code in ("404", "NoSuchKey", "NoSuchVersion"):
+                return None, None
+            return None, f"{code}: {e}"
+
+    def check_head(batch):
+        present, errors = [], {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for identifier, (found, error) in zip(batch, pool.map(head, batch)):
+                if found:
+                    present.append(found)
+                if error:
+                    errors[identifier["Key"]] = error
+        return len(batch), present, errors
+
+    if method == "list":
+        keys = sorted({_identifier(k)["Key"] for k in keys})
+        check = check_list
+    else:
+        check = check_head
+    checked, still_present, errors = 0, [], {}
+    start = time.perf_counter()
+    # HEAD batches already fan out per key, so only the listings run batch-parallel
+    for count, present, failed in _run_batches(check, keys, workers if method == "list" else 1, batch_size):
+        checked += count
+        still_present.extend(present)
+        errors.update(failed)
+    seconds = time.perf_counter() - start
+    if still_present or errors:
+        print(f"❌ {len(still_present)} of {checked} keys still exist, {len(errors)} checks failed ({seconds:.2f}s)")
+    else:
+        print(f"✅ Verified deleted: {checked} keys ({method}, {seconds:.2f}s)")
+    return {"checked": checked, "still_present": still_present, "errors": errors, "seconds": round(seconds, 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete everything under a prefix of the LMS bucket")
+    parser.add_argument("prefix")
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("--versions", action="store_true", help="also purge every version and delete marker")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--verify", choices=["list", "head"], default="list")
+    args = parser.parse_args()
+
+    s3 = boto3.client("s3", region_name=REGION)
+    report, deleted = delete_prefix(s3, args.bucket, args.prefix, args.versions, args.workers)
+    verify_deleted(s3, args.bucket, deleted, "head" if args.versions else args.verify, args.workers)
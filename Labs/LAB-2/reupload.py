@@ -1,5 +1,7 @@
 import boto3
 
+from version_catalog import VersionCatalog
+
 bucket = "hasaan-lms-lab2"
 region = "ap-south-1"
 s3 = boto3.client("s3", region_name=region)
@@ -9,12 +11,19 @@ key = "courses/CS101/weeks/week01/slides.pdf"
 s3.upload_file("DummyData/slides_CS101_week1.pdf", bucket, key, ExtraArgs={"ContentType": "application/pdf"})
 print(f" Re-uploaded corrected slide to {key}")
 
-# Step 2: List all versions for this object
+# Step 2: List all versions for this object (every page, indexed locally in versions.sqlite)
 print(" Listing versions for:", key)
-resp = s3.list_object_versions(Bucket=bucket, Prefix=key)
+catalog = VersionCatalog()
+catalog.refresh(s3, bucket, key)
+versions = catalog.latest(key, n=10)
 
-if "Versions" in resp:
-    for v in resp["Versions"]:
-        print(f"- VersionId: {v['VersionId']} | IsLatest: {v['IsLatest']} | Size: {v['Size']} bytes | LastModified: {v['LastModified']}")
+if versions:
+    for v in versions:
+        print(f"- VersionId: {v['version_id']} | IsLatest: {bool(v['is_latest'])} | Size: {v['size']} bytes | LastModified: {v['last_modified']}")
 else:
     print(" No versions found.")
+
+stats = catalog.noncurrent_bytes(key)
+print(f" Noncurrent versions: {stats['versions']} holding {stats['bytes']} bytes "
+      f"(prune with: python version_catalog.py prune {key} --keep 3)")
+catalog.close()
@@ -0,0 +1,81 @@
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bulk_delete import delete_keys, delete_prefix, verify_deleted  # noqa: E402
+
+BUCKET = "lms-test"
+
+
+@mock_aws
+class BulkDeleteTest(unittest.TestCase):
+    def setUp(self):
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=BUCKET, ObjectLockEnabledForBucket=True)
+        self.calls = Counter()
+        self.s3.meta.events.register("before-call.s3.*", self.count_call)
+
+    def count_call(self, model, **kwargs):
+        self.calls[model.name] += 1
+
+    def put(self, keys, **options):
+        return [self.s3.put_object(Bucket=BUCKET, Key=key, Body=b"x", **options)["VersionId"] for key in keys]
+
+    def remaining(self, prefix=""):
+        return sorted(obj["Key"] for obj in self.s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix).get("Contents", []))
+
+    def test_batches_of_1000(self):
+        keys = [f"courses/CS101/weeks/week01/f{i:04d}.pdf" for i in range(2001)]
+        self.put(keys)
+        self.calls.clear()
+
+        report = delete_keys(self.s3, BUCKET, keys, workers=2)
+
+        self.assertEqual((report["requested"], report["deleted"], report["requests"]), (2001, 2001, 3))
+        self.assertEqual(self.calls["DeleteObjects"], 3)
+        self.assertEqual(self.remaining(), [])
+
+    def test_per_key_errors(self):
+        free = self.put(["courses/CS101/a.pdf"])[0]
+        held = self.put(["courses/CS101/b.pdf"], ObjectLockLegalHoldStatus="ON")[0]
+
+        report = delete_keys(self.s3, BUCKET, [("courses/CS101/a.pdf", free), ("courses/CS101/b.pdf", held)])
+
+        self.assertEqual((report["requested"], report["deleted"]), (2, 1))
+        self.assertEqual([e["Key"] for e in report["errors"]], ["courses/CS101/b.pdf"])
+        self.assertEqual(self.remaining(), ["courses/CS101/b.pdf"])
+
+    def test_delete_prefix_versions(self):
+        self.put(["courses/CS101/a.pdf", "courses/CS101/a.pdf", "courses/CS202/a.pdf"])
+
+        report, deleted = delete_prefix(self.s3, BUCKET, "courses/CS101/", versions=True)
+
+        self.assertEqual(report["deleted"], 2)
+        self.assertEqual(verify_deleted(self.s3, BUCKET, deleted, method="head")["still_present"], [])
+        self.assertEqual(self.remaining(), ["courses/CS202/a.pdf"])
+
+    def test_list_check_grouped_by_folder(self):
+        gone = ["announcements/2024-09-01.txt", "announcements/2024-09-02.txt"]
+        kept = ["announcements/2024-09-03.txt", "announcements/2024-09-05.txt", "datasets/CS101/marks.csv"]
+        elsewhere = [f"announcements/2024-10-{d:02d}.txt" for d in range(1, 31)] + ["announcements/2024-08-31.txt"]
+        self.put(kept + elsewhere)
+        checked = gone + kept
+        self.calls.clear()
+
+        result = verify_deleted(self.s3, BUCKET, checked, method="list", workers=2)
+
+        self.assertEqual(result["checked"], len(checked))
+        self.assertEqual(sorted(i["Key"] for i in result["still_present"]), sorted(kept))
+        self.assertEqual(result["errors"], {})
+        # one listing for the folder with several keys, a HEAD for the lone one
+        self.assertEqual((self.calls["ListObjectsV2"], self.calls["HeadObject"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
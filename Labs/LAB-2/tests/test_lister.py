@@ -0,0 +1,47 @@
+import sys
+import unittest
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "DummyData"))
+
+from lister import list_parallel, list_serial  # noqa: E402
+
+BUCKET = "lms-test"
+
+
+@mock_aws
+class ListParallelTest(unittest.TestCase):
+    def setUp(self):
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=BUCKET)
+
+    def put(self, keys):
+        for key in keys:
+            self.s3.put_object(Bucket=BUCKET, Key=key, Body=b"x")
+
+    def test_sibling_sorting_before_slash_on_page_boundary(self):
+        # "s00999-late/" sorts before "s00999/" ('-' < '/') and ends the first
+        # page of 1,000 sub-prefixes; the second range starts after "s00999"
+        keys = [f"sub/a0/s{i:05d}/x.pdf" for i in range(1500)] + ["sub/a0/s00999-late/x.pdf"]
+        self.put(keys)
+
+        listed = [obj["Key"] for obj in list_parallel(self.s3, BUCKET, "sub/", workers=4)]
+
+        self.assertEqual(len(listed), len(keys))
+        self.assertEqual(sorted(listed), sorted(keys))
+
+    def test_matches_serial_listing(self):
+        keys = [f"courses/CS{c}/weeks/week{w:02d}/slides.pdf" for c in (101, 202) for w in range(1, 6)]
+        self.put(keys + ["courses/readme.txt"])
+
+        parallel = sorted(obj["Key"] for obj in list_parallel(self.s3, BUCKET, "courses/", workers=4))
+        serial = sorted(obj["Key"] for obj in list_serial(self.s3, BUCKET, "courses/"))
+
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "DummyData"))
+
+from presigner import Presigner  # noqa: E402
+
+BUCKET = "lms-test"
+
+
+@mock_aws
+class PresignerCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+
+    def test_cached_until_margin(self):
+        presigner = Presigner(self.s3, BUCKET, expires_in=600, margin=60)
+        with mock.patch("presigner.time.time", return_value=1000.0):
+            url = presigner.url("a.pdf")
+            self.assertEqual(presigner.url("a.pdf"), url)
+        with mock.patch("presigner.time.time", return_value=1540.0):
+            presigner.url("a.pdf")
+        self.assertEqual((presigner.hits, presigner.misses), (1, 2))
+
+    def test_size_limit(self):
+        presigner = Presigner(self.s3, BUCKET, max_entries=3)
+        presigner.urls(f"{i}.pdf" for i in range(5))
+
+        self.assertEqual([key[2] for key in presigner.cache], ["2.pdf", "3.pdf", "4.pdf"])
+
+    def test_stale_entries_dropped_on_insert(self):
+        presigner = Presigner(self.s3, BUCKET, expires_in=600, margin=60)
+        with mock.patch("presigner.time.time", return_value=1000.0):
+            presigner.urls(["a.pdf", "b.pdf"])
+        with mock.patch("presigner.time.time", return_value=1300.0):
+            presigner.url("c.pdf")
+        with mock.patch("presigner.time.time", return_value=1600.0):
+            presigner.url("d.pdf")
+
+        self.assertEqual([key[2] for key in presigner.cache], ["c.pdf", "d.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "DummyData"))
+
+from publisher import (  # noqa: E402
+    INDEX_NAME, MB, _HashingReader, build_manifest, load_index, map_key, sync_manifest, upload_manifest)
+
+BUCKET = "lms-test"
+
+
+class MapKeyTest(unittest.TestCase):
+    def test_rules(self):
+        self.assertEqual(map_key("slides_CS101_week1.pdf"), "courses/CS101/weeks/week01/slides.pdf")
+        self.assertEqual(map_key("marks_CS202.csv"), "datasets/CS202/marks.csv")
+        self.assertEqual(map_key("announcements-2024-09-01.txt"), "announcements/2024-09-01.txt")
+        self.assertEqual(map_key("sub_CS101_2023001_assignment1.pdf"),
+                         "submissions/CS101/assignment1/2023001/assignment.pdf")
+
+    def test_file_name_matched_in_any_folder(self):
+        self.assertEqual(map_key("week1/slides_CS101_week1.pdf"), "courses/CS101/weeks/week01/slides.pdf")
+
+    def test_bucket_layout_published_as_is(self):
+        self.assertEqual(map_key("courses/CS101/syllabus.pdf"), "courses/CS101/syllabus.pdf")
+
+    def test_no_rule(self):
+        self.assertIsNone(map_key("notes.txt"))
+        self.assertIsNone(map_key("slides_cs101_week1.pdf"))
+
+
+class TreeTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def write(self, relative, data=b"x"):
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+
+class BuildManifestTest(TreeTest):
+    def test_manifest_and_skipped(self):
+        self.write("slides_CS101_week1.pdf")
+        self.write("notes.txt")
+        self.write(".s3_index.json")
+
+        manifest, skipped = build_manifest(self.root)
+
+        self.assertEqual([entry["key"] for entry in manifest], ["courses/CS101/weeks/week01/slides.pdf"])
+        self.assertEqual(manifest[0]["content_type"], "application/pdf")
+        self.assertEqual(skipped, ["notes.txt"])
+
+    def test_duplicate_keys(self):
+        self.write("slides_CS101_week1.pdf")
+        self.write("courses/CS101/weeks/week01/slides.pdf")
+
+        with self.assertRaisesRegex(ValueError, "courses/CS101/weeks/week01/slides.pdf"):
+            build_manifest(self.root)
+
+
+@mock_aws
+class UploadManifestTest(TreeTest):
+    def setUp(self):
+        super().setUp()
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=BUCKET)
+
+    def test_multipart_above_part_size(self):
+        self.write("marks_CS101.csv", b"a" * (5 * MB + 1))
+        self.write("marks_CS202.csv", b"b" * 100)
+        manifest, _ = build_manifest(self.root)
+
+        report = upload_manifest(self.s3, BUCKET, manifest, workers=2, part_size=5 * MB, part_concurrency=2)
+
+        self.assertEqual((report["files"], report["bytes"], report["failed"]), (2, 5 * MB + 101, {}))
+        large = self.s3.head_object(Bucket=BUCKET, Key="datasets/CS101/marks.csv")
+        small = self.s3.head_object(Bucket=BUCKET, Key="datasets/CS202/marks.csv")
+        self.assertTrue(large["ETag"].endswith('-2"'))
+        self.assertNotIn("-", small["ETag"])
+
+    def test_failure_report(self):
+        self.write("marks_CS101.csv")
+        manifest, _ = build_manifest(self.root)
+        manifest.append({"path": str(self.root / "missing.csv"), "key": "datasets/CS202/marks.csv",
+                         "size": 10, "content_type": "text/csv"})
+
+        report = upload_manifest(self.s3, BUCKET, manifest, workers=2)
+
+        self.assertEqual((report["files"], report["bytes"]), (1, 1))
+        self.assertEqual(list(report["failed"]), ["datasets/CS202/marks.csv"])
+        self.assertIn("FileNotFoundError", report["failed"]["datasets/CS202/marks.csv"])
+
+
+@mock_aws
+class SyncManifestTest(TreeTest):
+    def setUp(self):
+        super().setUp()
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=BUCKET)
+        self.s3.put_bucket_versioning(Bucket=BUCKET, VersioningConfiguration={"Status": "Enabled"})
+        self.index = self.root / INDEX_NAME
+
+    def sync(self, **options):
+        return sync_manifest(self.s3, BUCKET, build_manifest(self.root)[0], self.index, workers=2, **options)
+
+    def versions(self):
+        return len(self.s3.list_object_versions(Bucket=BUCKET).get("Versions", []))
+
+    def test_second_sync_uploads_nothing(self):
+        self.write("slides_CS101_week1.pdf", b"slides")
+        self.write("marks_CS101.csv", b"marks")
+        self.assertEqual(self.sync()["files"], 2)
+
+        report = self.sync()
+
+        self.assertEqual((report["files"], report["unchanged"], report["hashed"]), (0, 2, 0))
+        self.assertEqual(self.versions(), 2)
+
+    def test_touched_file_hashed_and_skipped(self):
+        path = self.write("marks_CS101.csv", b"marks")
+        self.sync()
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        report = self.sync()
+
+        self.assertEqual((report["files"], report["unchanged"], report["hashed"]), (0, 1, 1))
+        self.assertEqual(self.versions(), 1)
+        self.assertEqual(load_index(self.index)["datasets/CS101/marks.csv"]["mtime_ns"], path.stat().st_mtime_ns)
+
+    def test_changed_file_uploaded(self):
+        path = self.write("marks_CS101.csv", b"marks")
+        self.sync()
+        path.write_bytes(b"marks, corrected")
+
+        report = self.sync()
+
+        self.assertEqual((report["files"], report["hashed"]), (1, 1))
+        self.assertEqual(self.versions(), 2)
+
+    def test_multipart_etag(self):
+        data = b"a" * (5 * MB) + b"b" * 1000
+        self.write("marks_CS101.csv", data)
+        self.sync(part_size=5 * MB)
+
+        remote = self.s3.head_object(Bucket=BUCKET, Key="datasets/CS101/marks.csv")["ETag"]
+        reader = _HashingReader(None, 5 * MB)
+        reader.update(data)
+        self.assertEqual(reader.etag(True), remote)
+        self.assertTrue(remote.endswith('-2"'))
+        self.assertEqual(load_index(self.index)["datasets/CS101/marks.csv"]["etag"], remote)
+
+
+if __name__ == "__main__":
+    unittest.main()
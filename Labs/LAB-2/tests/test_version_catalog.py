@@ -0,0 +1,76 @@
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_catalog import VersionCatalog  # noqa: E402
+
+BUCKET = "lms-test"
+KEY = "courses/CS101/weeks/week01/slides.pdf"
+
+
+@mock_aws
+class VersionCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=BUCKET, ObjectLockEnabledForBucket=True)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.catalog = VersionCatalog(Path(directory) / "versions.sqlite")
+        self.addCleanup(self.catalog.close)
+        # oldest first; sizes 1..5 tell the versions apart
+        self.versions = [self.s3.put_object(Bucket=BUCKET, Key=KEY, Body=b"x" * size)["VersionId"]
+                         for size in range(1, 6)]
+        self.s3.put_object(Bucket=BUCKET, Key="courses/CS101/syllabus.pdf", Body=b"x")
+        self.s3.put_object(Bucket=BUCKET, Key="datasets/CS101/marks.csv", Body=b"x")
+
+    def test_refresh(self):
+        self.assertEqual(self.catalog.refresh(self.s3, BUCKET, "courses/"), 6)
+
+        latest = self.catalog.latest(KEY)
+        self.assertEqual([v["version_id"] for v in latest], self.versions[::-1])
+        self.assertEqual([v["position"] for v in latest], [0, 1, 2, 3, 4])
+        self.assertEqual([v["is_latest"] for v in latest], [1, 0, 0, 0, 0])
+        self.assertEqual(self.catalog.noncurrent_bytes("courses/"), {"versions": 4, "bytes": 10, "keys": 1})
+        self.assertEqual(self.catalog.latest("datasets/CS101/marks.csv"), [])
+
+    def test_prune_keep(self):
+        self.catalog.refresh(self.s3, BUCKET, "courses/")
+
+        report = self.catalog.prune(self.s3, BUCKET, "courses/", keep=2)
+
+        self.assertEqual((report["deleted"], report["bytes_freed"]), (3, 6))
+        remaining = self.s3.list_object_versions(Bucket=BUCKET, Prefix=KEY)["Versions"]
+        self.assertEqual(sorted(v["VersionId"] for v in remaining), sorted(self.versions[3:]))
+        self.assertEqual([v["version_id"] for v in self.catalog.latest(KEY)], self.versions[:2:-1])
+        self.assertEqual(self.catalog.latest("courses/CS101/syllabus.pdf")[0]["position"], 0)
+
+    def test_positions_close_up(self):
+        # the version at position 3 is held, so positions 2 and 4 go and it is left behind 0 and 1
+        held = self.versions[1]
+        self.s3.put_object_legal_hold(Bucket=BUCKET, Key=KEY, VersionId=held, LegalHold={"Status": "ON"})
+        self.catalog.refresh(self.s3, BUCKET, "courses/")
+
+        def with_version_id(parsed, **kwargs):
+            # S3 names the version in a per-key error; moto leaves it out
+            for error in parsed.get("Errors", []):
+                error.setdefault("VersionId", held)
+
+        self.s3.meta.events.register("after-call.s3.DeleteObjects", with_version_id)
+        report = self.catalog.prune(self.s3, BUCKET, "courses/", keep=2)
+
+        self.assertEqual((report["deleted"], [e["VersionId"] for e in report["errors"]]), (2, [held]))
+        latest = self.catalog.latest(KEY)
+        self.assertEqual([v["version_id"] for v in latest], [self.versions[4], self.versions[3], held])
+        self.assertEqual([v["position"] for v in latest], [0, 1, 2])
+        self.assertEqual([v["version_id"] for v in self.catalog.prunable("courses/", keep=2)], [held])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,246 @@
+"""
+Local Object-Version Catalog with Bulk Pruning
+----------------------------------------------
+With versioning enabled every re-upload of a slide deck keeps the old copy,
+and list_object_versions is the only way to see them: one page of 1,000
+versions per request, nothing aggregated. This catalog pages through
+list_object_versions for a prefix once and keeps the result in a local
+SQLite index (CATALOG_PATH), so these are answered from the index:
+
+- latest(key, n): the n newest versions of a key
+- older_than(prefix, when): noncurrent versions last modified before `when`
+- noncurrent_bytes(prefix): versions and bytes held by noncurrent versions
+
+prune() deletes noncurrent versions beyond the newest `keep` of each key
+and/or older than a cutoff with batched delete_objects requests
+(bulk_delete.delete_keys) and drops the deleted rows from the index. The
+current version of a key is never pruned. refresh() a prefix again after
+other writers have changed it.
+
+Usage:
+    python version_catalog.py refresh courses/
+    python version_catalog.py stats courses/
+    python version_catalog.py latest courses/CS101/weeks/week01/slides.pdf -n 3
+    python version_catalog.py prune courses/ --keep 3 [--older-than-days 30] [--dry-run]
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from xml.etree import ElementTree
+
+import boto3
+
+from bulk_delete import delete_keys
+
+BUCKET = "hasaan-lms-lab2"
+REGION = "ap-south-1"
+CATALOG_PATH = Path(__file__).parent / "versions.sqlite"
+
+_COLUMNS = ("key", "version_id", "position", "is_latest", "is_delete_marker", "size", "etag", "last_modified")
+
+
+def _timestamp(value):
+    """UTC ISO timestamp: sorts as text in time order."""
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _prefix_condition(prefix):
+    """SQL condition (and params) for keys under `prefix` as a key range, so the primary key serves it."""
+    if not prefix:
+        return "1 = 1", []
+    return "key >= ? AND key < ?", [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+
+def _record_listed_order(parsed, http_response, **kwargs):
+    """
+    S3 lists each key's versions and delete markers interleaved, newest
+    first, but botocore parses them into two lists. Stamps every entry with
+    its position in the response so that order can be restored.
+    """
+    try:
+        root = ElementTree.fromstring(http_response.content)
+    except ElementTree.ParseError:
+        return
+    lists = {"Version": iter(parsed.get("Versions", [])), "DeleteMarker": iter(parsed.get("DeleteMarkers", []))}
+    for position, element in enumerate(root):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag in lists:
+            entry = next(lists[tag], None)
+            if entry is not None:
+                entry["ListedPosition"] = position
+
+
+class VersionCatalog:
+    """SQLite index of every version under the refreshed prefixes."""
+
+    def __init__(self, path=CATALOG_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS versions (
+                key TEXT NOT NULL,
+                version_id TEXT NOT NULL,
+                position INTEGER NOT NULL,      -- 0 = newest version of the key
+                is_latest INTEGER NOT NULL,
+                is_delete_marker INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT NOT NULL,    -- UTC ISO timestamp
+                PRIMARY KEY (key, version_id)
+            );
+            CREATE INDEX IF NOT EXISTS versions_key_position ON versions (key, position);
+            CREATE INDEX IF NOT EXISTS versions_noncurrent ON versions (is_latest, last_modified);
+            CREATE TABLE IF NOT EXISTS refreshes (
+                prefix TEXT PRIMARY KEY,
+                refreshed TEXT NOT NULL,
+                versions INTEGER NOT NULL
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def refresh(self, s3, bucket, prefix=""):
+        """Replaces the index entries under `prefix` with a fresh paginated listing; returns the version count."""
+        start = time.perf_counter()
+        positions = {}
+        count = 0
+        s3.meta.events.register("after-call.s3.ListObjectVersions", _record_listed_order,
+                                unique_id="version_catalog.listed_order")
+        condition, params = _prefix_condition(prefix)
+        with self.conn:
+            self.conn.execute(f"DELETE FROM versions WHERE {condition};", params)
+            paginator = s3.get_paginator("list_object_versions")
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                entries = [(v, 0) for v in page.get("Versions", [])] + \
+                          [(m, 1) for m in page.get("DeleteMarkers", [])]
+                if all("ListedPosition" in e for e, _ in entries):
+                    # S3's own order: per key, versions and delete markers newest first
+                    entries.sort(key=lambda e: e[0]["ListedPosition"])
+                else:
+                    # no response order to go by: merge by time, the latest first
+                    entries.sort(key=lambda e: (e[0]["Key"], not e[0]["IsLatest"],
+                                                -e[0]["LastModified"].timestamp()))
+                rows = []
+                for entry, marker in entries:
+                    position = positions.get(entry["Key"], 0)
+                    positions[entry["Key"]] = position + 1
+                    rows.append((entry["Key"], entry["VersionId"], position, int(entry["IsLatest"]), marker,
+                                 entry.get("Size", 0), entry.get("ETag"), _timestamp(entry["LastModified"])))
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO versions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))});",
+                    rows)
+                count += len(rows)
+            self.conn.execute("INSERT OR REPLACE INTO refreshes VALUES (?, ?, ?);",
+                              (prefix, datetime.now(timezone.utc).isoformat(timespec="seconds"), count))
+        print(f"📚 Indexed {count} versions of {len(positions)} keys under '{prefix}' "
+              f"in {time.perf_counter() - start:.2f}s")
+        return count
+
+    def _rows(self, sql, params):
+        cursor = self.conn.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def latest(self, key, n=5):
+        """The `n` newest versions (and delete markers) of `key`, newest first."""
+        return self._rows(
+            "SELECT * FROM versions WHERE key = ? AND position < ? ORDER BY position;", (key, n))
+
+    def older_than(self, prefix, when):
+        """Noncurrent versions under `prefix` last modified before `when` (a datetime), oldest first."""
+        condition, params = _prefix_condition(prefix)
+        return self._rows(f"""
+            SELECT * FROM versions
+            WHERE is_latest = 0 AND last_modified < ? AND {condition}
+            ORDER BY last_modified;
+        """, [_timestamp(when)] + params)
+
+    def noncurrent_bytes(self, prefix=""):
+        """{versions, bytes, keys} held by noncurrent versions under `prefix`."""
+        condition, params = _prefix_condition(prefix)
+        return self._rows(f"""
+            SELECT COUNT(*) AS versions, COALESCE(SUM(size), 0) AS bytes, COUNT(DISTINCT key) AS keys
+            FROM versions
+            WHERE is_latest = 0 AND {condition};
+        """, params)[0]
+
+    def prunable(self, prefix="", keep=None, older_than=None):
+        """Noncurrent versions beyond the newest `keep` of each key and/or last modified before `older_than`."""
+        condition, params = _prefix_condition(prefix)
+        conditions = ["is_latest = 0", condition]
+        if keep is not None:
+            conditions.append("position >= ?")
+            params.append(keep)
+        if older_than is not None:
+            conditions.append("last_modified < ?")
+            params.append(_timestamp(older_than))
+        if keep is None and older_than is None:
+            raise ValueError("pass keep and/or older_than")
+        return self._rows(f"SELECT * FROM versions WHERE {' AND '.join(conditions)} ORDER BY key, position;",
+                          params)
+
+    def prune(self, s3, bucket, prefix="", keep=None, older_than=None, dry_run=False, workers=8):
+        """
+        Deletes the prunable versions with batched delete_objects requests
+        and removes them from the index.
+
+        Returns:
+            delete report (bulk_delete.delete_keys) plus the bytes freed
+        """
+        victims = self.prunable(prefix, keep, older_than)
+        size = sum(v["size"] for v in victims)
+        print(f"✂️ {len(victims)} noncurrent versions ({size / 1024 ** 2:.1f} MB) to prune under '{prefix}'")
+        if dry_run or not victims:
+            return {"requested": len(victims), "deleted": 0, "bytes_freed": 0, "errors": []}
+
+        report = delete_keys(s3, bucket, ({"Key": v["key"], "VersionId": v["version_id"]} for v in victims),
+                             workers)
+        failed = {(e["Key"], e["VersionId"]) for e in report["errors"]}
+        deleted = [v for v in victims if (v["key"], v["version_id"]) not in failed]
+        condition, params = _prefix_condition(prefix)
+        with self.conn:
+            self.conn.executemany("DELETE FROM versions WHERE key = ? AND version_id = ?;",
+                                  [(v["key"], v["version_id"]) for v in deleted])
+            # positions behind the pruned versions close up
+            self.conn.execute(f"""
+                UPDATE versions SET position = (
+                    SELECT COUNT(*) FROM versions newer
+                    WHERE newer.key = versions.key AND newer.position < versions.position
+                )
+                WHERE {condition};
+            """, params)
+        report["bytes_freed"] = sum(v["size"] for v in deleted)
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index, query and prune object versions of the LMS bucket")
+    parser.add_argument("command", choices=["refresh", "stats", "latest", "prune"])
+    parser.add_argument("prefix", nargs="?", default="", help="prefix (or key for 'latest')")
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("-n", type=int, default=5, help="versions shown by 'latest'")
+    parser.add_argument("--keep", type=int, help="newest versions kept per key by 'prune'")
+    parser.add_argument("--older-than-days", type=int, help="prune noncurrent versions older than this")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    s3 = boto3.client("s3", region_name=REGION)
+    catalog = VersionCatalog()
+    if args.command == "refresh":
+        catalog.refresh(s3, args.bucket, args.prefix)
+    elif args.command == "stats":
+        stats = catalog.noncurrent_bytes(args.prefix)
+        print(f"{stats['versions']} noncurrent versions of {stats['keys']} keys hold "
+              f"{stats['bytes'] / 1024 ** 2:.1f} MB under '{args.prefix}'")
+    elif args.command == "latest":
+        for v in catalog.latest(args.prefix, args.n):
+            print(f"- VersionId: {v['version_id']} | IsLatest: {bool(v['is_latest'])} | Size: {v['size']} bytes "
+                  f"| LastModified: {v['last_modified']}" + (" | delete marker" if v["is_delete_marker"] else ""))
+    else:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+                  if args.older_than_days is not None else None)
+        catalog.prune(s3, args.bucket, args.prefix, args.keep, cutoff, args.dry_run)
+    catalog.close()